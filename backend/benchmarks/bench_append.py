@@ -0,0 +1,132 @@
+"""
+Benchmark for the [aX] append stage.
+
+Compares the original per-row implementations of weighted `generate`,
+`nullable` and `replace` against append_data, checks that they agree
+(same replacements, same distributions), then times both.
+
+    python benchmarks/bench_append.py              # 1e6 rows
+    python benchmarks/bench_append.py 100000       # custom row counts
+"""
+
+import configparser
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import append_data, replace_values  # noqa: E402
+
+OPTIONS = ["Enterprise", "SMB", "Individual", "Government"]
+WEIGHTS = [40, 30, 20, 10]
+PRODUCTS = [f"P{i}" for i in range(1, 21)]
+FINDS = ["P1", "P2", "P3", "P20"]
+REPLACES = ["Laptop", "Monitor", "Keyboard", "USB_Drive"]
+NULLABLE = 0.1
+
+
+def legacy_generate(num_rows):
+    data = [random.choices(OPTIONS, weights=WEIGHTS)[0] for _ in range(num_rows)]
+    for i in range(len(data)):
+        if random.random() < NULLABLE:
+            data[i] = None
+    return data
+
+
+def legacy_replace(values):
+    for find, replace in zip(FINDS, REPLACES):
+        values = values.replace(find, replace)
+    return values
+
+
+def append_config(num_rows):
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "rec": {"num": str(num_rows), "mode": "2", "seed": "0"},
+            "a1": {
+                "operation": "replace",
+                "cols": "1",
+                "find": ",".join(FINDS),
+                "replace": ",".join(REPLACES),
+            },
+            "a2": {
+                "operation": "generate",
+                "data": "random",
+                "new_col": "Customer_Type",
+                "options": ",".join(OPTIONS),
+                "weights": ",".join(str(w) for w in WEIGHTS),
+                "nullable": str(NULLABLE),
+            },
+        }
+    )
+    return config
+
+
+def products(num_rows):
+    picks = np.random.default_rng(1).integers(0, len(PRODUCTS), num_rows)
+    return pd.DataFrame({"Product": np.array(PRODUCTS)[picks]})
+
+
+def check_equivalence(num_rows=200_000):
+    df = products(num_rows)
+    expected = legacy_replace(df["Product"]).tolist()
+    assert replace_values(df["Product"], FINDS, REPLACES).tolist() == expected
+
+    result = append_data(append_config(num_rows), products(num_rows))
+    assert result["Product"].tolist() == expected, "replace mismatch"
+
+    column = result["Customer_Type"]
+    assert str(column.dtype) == "string", column.dtype
+    assert abs(column.isna().mean() - NULLABLE) < 0.01, "nullable rate off"
+    shares = column.value_counts(normalize=True)
+    for option, weight in zip(OPTIONS, WEIGHTS):
+        assert abs(shares[option] - weight / sum(WEIGHTS)) < 0.01, option
+    print("equivalence: ok")
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(num_rows):
+    df = products(num_rows)
+    config = append_config(num_rows)
+
+    cases = [
+        (
+            "generate+nullable",
+            lambda: legacy_generate(num_rows),
+            lambda: append_data(config, df[[]].copy()),
+        ),
+        (
+            f"replace x{len(FINDS)}",
+            lambda: legacy_replace(df["Product"]),
+            lambda: replace_values(df["Product"], FINDS, REPLACES),
+        ),
+        (
+            "append stage",
+            lambda: (legacy_replace(df["Product"]), legacy_generate(num_rows)),
+            lambda: append_data(config, df.copy()),
+        ),
+    ]
+    print(f"\n{num_rows:,} rows")
+    print(f"{'step':<20}{'per-row (s)':>14}{'vectorized (s)':>16}{'speedup':>10}")
+    for name, legacy, vectorized in cases:
+        before = timed(legacy)
+        after = timed(vectorized)
+        print(f"{name:<20}{before:>14.3f}{after:>16.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or [1_000_000]
+    check_equivalence()
+    for size in sizes:
+        run(size)
@@ -0,0 +1,109 @@
+"""
+Benchmark for `conditional_random` columns with many parent values.
+
+Writes a weights file with one weight row per product, then draws the
+child column for every row both as the old post-processing did (one
+rng.choice per row with the weights of its parent) and through the
+grouped sampler, compares the share of each option per parent, and times
+a full compile + generate from the weights file.
+
+    python benchmarks/bench_conditional.py                 # 5000 parents, 1e6 rows
+    python benchmarks/bench_conditional.py 1e7 20000        # rows, parents
+"""
+
+import configparser
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import generate_data, parent_groups  # noqa: E402
+from fakerengine.rng import make_grouped_sampler  # noqa: E402
+
+SEED = 0
+KEY = 1
+OPTIONS = ["1", "2", "5", "10", "20", "50"]
+# The per-row loop is slow; time it on this many rows and scale up
+LOOP_ROWS = 100_000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def per_row(parents, keys, weights):
+    rng = np.random.default_rng(SEED)
+    positions = {key: pos for pos, key in enumerate(keys)}
+    p = weights / weights.sum(axis=1, keepdims=True)
+    return np.array(
+        [rng.choice(len(OPTIONS), p=p[positions[parent]]) for parent in parents]
+    )
+
+
+def run(num_rows, num_parents):
+    rng = np.random.default_rng(1)
+    keys = [f"P{i:05d}" for i in range(num_parents)]
+    weights = rng.integers(0, 10, (num_parents, len(OPTIONS))).astype(float)
+    weights[:, 0] += 1  # no all-zero rows
+    parents = np.array(keys, dtype=object)[rng.integers(0, num_parents, num_rows)]
+
+    loop_rows = min(LOOP_ROWS, num_rows)
+    before, expected = timed(lambda: per_row(parents[:loop_rows], keys, weights))
+    before *= num_rows / loop_rows
+
+    sampler = make_grouped_sampler(np.vstack([weights, np.ones(len(OPTIONS))]))
+    after, picks = timed(
+        lambda: sampler.rows(SEED, KEY, 0, num_rows, parent_groups(parents, keys))
+    )
+    # Different streams, so compare the overall shares of each option
+    shares = np.bincount(picks, minlength=len(OPTIONS)) / num_rows
+    expected_shares = np.bincount(expected, minlength=len(OPTIONS)) / loop_rows
+    assert np.abs(shares - expected_shares).max() < 0.01, "option shares differ"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "quantity.parquet")
+        parent_idx, option_idx = np.nonzero(weights)
+        pd.DataFrame(
+            {
+                "product": np.array(keys)[parent_idx],
+                "quantity": np.array(OPTIONS)[option_idx],
+                "weight": weights[parent_idx, option_idx],
+            }
+        ).to_parquet(path)
+        config = configparser.ConfigParser()
+        config.read_dict(
+            {
+                "rec": {"num": str(num_rows), "seed": str(SEED)},
+                "c1": {"name": "Product", "options": ",".join(keys)},
+                "c2": {
+                    "name": "Quantity",
+                    "dtype": "int",
+                    "data": "conditional_random",
+                    "cols": "1",
+                    "options": ",".join(OPTIONS),
+                    "weights_file": path,
+                },
+            }
+        )
+        generate_data(config, 1000)  # compile, import pandas
+        generate_seconds, _ = timed(lambda: generate_data(config))
+
+    print(f"\n{num_rows:,} rows, {num_parents:,} parent values")
+    print(f"{'rng.choice per row':<28}{before:>10.3f} s  (from {loop_rows:,} rows)")
+    print(f"{'grouped sampler':<28}{after:>10.3f} s")
+    print(f"{'speedup':<28}{before / after:>10.1f}x")
+    print(f"{'weights_file generate':<28}{generate_seconds:>10.3f} s")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+    num_rows = args[0] if args else 1_000_000
+    num_parents = args[1] if len(args) > 1 else 5_000
+    run(num_rows, num_parents)
@@ -0,0 +1,68 @@
+"""
+Benchmark for the distribution sources (uniform, normal, lognormal,
+poisson, date_range, timestamp).
+
+Times generating one column of each source through generate_data, then
+checks that the rows do not depend on how they are split into chunks.
+
+    python benchmarks/bench_distributions.py            # 1e6 rows
+    python benchmarks/bench_distributions.py 1e7
+"""
+
+import configparser
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import generate_data  # noqa: E402
+
+SEED = 0
+
+COLUMNS = {
+    "uniform": {"min": "0", "max": "1000"},
+    "normal": {"mean": "100", "std": "15", "min": "0"},
+    "lognormal": {"mean": "3", "std": "0.5"},
+    "poisson": {"mean": "4"},
+    "date_range": {"start": "2020-01-01", "end": "2024-12-31"},
+    "timestamp": {"start": "2024-01-01", "end": "2024-12-31", "precision": "ms"},
+}
+
+
+def make_config(num_rows, data_source):
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "rec": {"num": str(num_rows), "seed": str(SEED)},
+            "c1": {"name": data_source, "data": data_source, **COLUMNS[data_source]},
+        }
+    )
+    return config
+
+
+def run(num_rows):
+    generate_data(make_config(1000, "uniform"))  # import pandas, warm up
+    print(f"\n{num_rows:,} rows")
+    for data_source in COLUMNS:
+        config = make_config(num_rows, data_source)
+        start = time.perf_counter()
+        df = generate_data(config)
+        seconds = time.perf_counter() - start
+
+        half = num_rows // 2
+        chunks = pd.concat(
+            [generate_data(config, half), generate_data(config, num_rows - half, half)],
+            ignore_index=True,
+        )
+        assert df.equals(chunks), f"{data_source}: chunked rows differ"
+        print(
+            f"{data_source:<12}{seconds:>10.3f} s{num_rows / seconds / 1e6:>10.1f} M rows/s"
+            f"  {df.iloc[:, 0].dtype}"
+        )
+
+
+if __name__ == "__main__":
+    run(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,89 @@
+"""
+Benchmark for extending an output with --extend.
+
+Writes BASE rows of the shipped rules.ini (with a faker pool), then
+compares regenerating the whole dataset at BASE + DELTA rows with
+appending the DELTA new rows to the existing file through its state
+manifest. Checks that the extended file matches the fresh full-size run,
+for CSV and Parquet. Parquet files are rewritten with their row groups
+copied, so extending them still costs a pass over the existing rows.
+
+    python benchmarks/bench_extend.py                 # 1e6 + 1e5 rows
+    python benchmarks/bench_extend.py 1e7 1e6         # base, delta
+"""
+
+import configparser
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import main  # noqa: E402
+
+RULES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "rules.ini",
+)
+SEED = 0
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def write_rules(directory, num):
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(RULES)
+    config["rec"]["num"] = str(num)
+    # Per-row faker values would dominate both timings
+    config["a3"]["pool"] = "1000"
+    path = os.path.join(directory, f"rules_{num}.ini")
+    with open(path, "w") as f:
+        config.write(f)
+    return path
+
+
+def cli(*args):
+    assert main([*args, "--seed", str(SEED), "--log-level", "WARNING"]) == 0
+
+
+def run(base, delta):
+    with tempfile.TemporaryDirectory() as directory:
+        small = write_rules(directory, base)
+        full = write_rules(directory, base + delta)
+        print(f"\n{base:,} rows + {delta:,} rows")
+
+        for name in ("out.csv", "out.parquet"):
+            fresh = os.path.join(directory, "fresh_" + name)
+            extended = os.path.join(directory, name)
+            cli("--config", small, "--output", extended)
+
+            before, _ = timed(lambda: cli("--config", full, "--output", fresh))
+            after, _ = timed(
+                lambda: cli(
+                    "--config", small, "--output", extended, "--extend", str(delta)
+                )
+            )
+
+            if name.endswith(".csv"):
+                assert filecmp.cmp(extended, fresh, shallow=False), "CSV mismatch"
+            else:
+                assert pq.read_table(extended).equals(
+                    pq.read_table(fresh)
+                ), "Parquet mismatch"
+
+            print(f"{name:<14}{'fresh full run':<18}{before:>10.3f} s")
+            print(f"{'':<14}{'--extend':<18}{after:>10.3f} s")
+            print(f"{'':<14}{'speedup':<18}{before / after:>10.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+    run(args[0] if args else 1_000_000, args[1] if len(args) > 1 else 100_000)
@@ -0,0 +1,79 @@
+"""
+Benchmark for `reference` columns backed by a lookup_file.
+
+Builds a product -> price file, then generates the price column chunk by
+chunk (CHUNK_SIZE rows) both ways: building `dict(zip(keys, values))` and
+mapping each chunk through it, as inline reference columns do, against
+lookup_values on the memory-mapped table. Checks that they agree and
+times building the table cache, reopening it and the joins.
+
+    python benchmarks/bench_lookup.py                 # 1e6 keys, 1e6 rows
+    python benchmarks/bench_lookup.py 1e5 1e7         # keys, rows
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.lookup import load_lookup, lookup_values  # noqa: E402
+
+CHUNK_SIZE = 100_000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(num_keys, num_rows):
+    rng = np.random.default_rng(0)
+    keys = np.array([f"P{i:07d}" for i in range(num_keys)], dtype=object)
+    prices = np.round(rng.uniform(1, 500, num_keys), 2)
+    # A few referenced values are missing from the file
+    ref = pd.Series(
+        np.append(keys, ["unknown"])[rng.integers(0, num_keys + 1, num_rows)]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "prices.parquet")
+        pd.DataFrame({"product": keys, "price": prices}).to_parquet(path)
+        cache_dir = os.path.join(directory, "cache")
+
+        build, _ = timed(lambda: load_lookup(path, None, None, "float64", cache_dir))
+        reopen, table = timed(
+            lambda: load_lookup(path, None, None, "float64", cache_dir)
+        )
+        chunks = [ref[i : i + CHUNK_SIZE] for i in range(0, num_rows, CHUNK_SIZE)]
+
+        def legacy():
+            return np.concatenate(
+                [
+                    chunk.map(dict(zip(keys, prices))).fillna(prices[-1]).to_numpy()
+                    for chunk in chunks
+                ]
+            )
+
+        before, expected = timed(legacy)
+        after, values = timed(
+            lambda: np.concatenate([lookup_values(chunk, table) for chunk in chunks])
+        )
+        assert np.array_equal(values, expected), "lookup mismatch"
+
+    print(f"\n{num_keys:,} keys, {num_rows:,} rows")
+    print(f"{'build cache':<24}{build:>10.3f} s")
+    print(f"{'reopen (mmap)':<24}{reopen:>10.3f} s")
+    print(f"{'dict + .map':<24}{before:>10.3f} s")
+    print(f"{'sorted-key join':<24}{after:>10.3f} s")
+    print(f"{'speedup':<24}{before / after:>10.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+    run(args[0] if args else 1_000_000, args[1] if len(args) > 1 else 1_000_000)
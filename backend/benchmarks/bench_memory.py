@@ -0,0 +1,55 @@
+"""
+Peak memory, allocation and block counts for generate_data.
+
+Runs the [cX] columns of the shipped rules.ini (no [aX] rules), then runs
+them again under tracemalloc. Reports the untraced wall time, the peak
+traced memory, the number of column-sized allocations still alive at the
+end, and how many internal blocks the resulting DataFrame has.
+
+    python benchmarks/bench_memory.py              # 1e6 rows
+    python benchmarks/bench_memory.py 10000000
+"""
+
+import configparser
+import os
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fakerengine.fakerdata import generate_data  # noqa: E402
+
+RULES_PATH = os.path.join(os.path.dirname(BACKEND_DIR), "rules.ini")
+
+
+def run(num_rows):
+    config = configparser.ConfigParser()
+    config.read(RULES_PATH)
+    config["rec"]["num"] = str(num_rows)
+    config["rec"]["seed"] = "0"
+
+    start = time.perf_counter()
+    generate_data(config)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    df = generate_data(config)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    column_bytes = num_rows * 8
+    large = sum(1 for trace in snapshot.traces if trace.size >= column_bytes)
+    frame_bytes = df.memory_usage(deep=False).sum()
+    print(f"{num_rows:,} rows, {len(df.columns)} columns")
+    print(f"  wall time          {elapsed:8.2f} s")
+    print(f"  peak traced memory {peak / 2**20:8.1f} MiB")
+    print(f"  frame (shallow)    {frame_bytes / 2**20:8.1f} MiB")
+    print(f"  column-size allocations live at end {large}")
+    print(f"  frame blocks       {len(df._mgr.blocks)}")
+
+
+if __name__ == "__main__":
+    run(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,122 @@
+"""
+Equivalence check and benchmark for the reference_* dependent columns.
+
+Compares the vectorized lookups in fakerengine.fakerdata against the
+original per-row implementations, then times both.
+
+    python benchmarks/bench_reference.py              # 1e5 and 1e7 rows
+    python benchmarks/bench_reference.py 100000       # custom row counts
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import (  # noqa: E402
+    choose_on_condition,
+    lookup_reference,
+    lookup_reference_range,
+)
+from fakerengine.rng import integer_rows  # noqa: E402
+
+RANGES = ["3", "6", "9", "12"]
+RANGE_VALUES = ["1", "2", "3", "4"]
+REPS = [f"Rep_{i}" for i in range(1, 13)]
+MANAGERS = [f"Manager_{i % 4}" for i in range(1, 13)]
+QUANTITIES = ["1", "2", "3", "4", "5"]
+
+
+def legacy_reference_range(ref_vals, ranges, values):
+    return ref_vals.apply(
+        lambda val: next(
+            (v for r, v in zip(ranges, values) if val <= int(r)), values[-1]
+        )
+    )
+
+
+def legacy_reference(ref_vals, keys, values):
+    mapping = dict(zip(keys, values))
+    return ref_vals.map(lambda v: mapping.get(v, values[-1]))
+
+
+def legacy_choose_on_condition(ref_vals, condition, values):
+    return ref_vals.apply(lambda v: random.choice(values) if int(v) == condition else 0)
+
+
+def check_equivalence():
+    ints = pd.Series(np.random.randint(0, 15, size=5000))
+    unsorted = ["6", "3", "12", "9"]
+    for ranges in (RANGES, unsorted, ["5"]):
+        expected = legacy_reference_range(ints, ranges, RANGE_VALUES).tolist()
+        actual = lookup_reference_range(ints.to_numpy(), ranges, RANGE_VALUES)
+        assert actual.tolist() == expected, f"reference_range mismatch for {ranges}"
+
+    strs = pd.Series(np.random.choice(REPS + ["Unknown"], size=5000)).astype(str)
+    strs[::97] = None
+    expected = legacy_reference(strs, REPS, MANAGERS).tolist()
+    assert lookup_reference(strs, REPS, MANAGERS).tolist() == expected
+    dup_keys = REPS + ["Rep_1"]
+    expected = legacy_reference(strs, dup_keys, MANAGERS + ["Override"]).tolist()
+    actual = lookup_reference(strs, dup_keys, MANAGERS + ["Override"]).tolist()
+    assert actual == expected, "reference mismatch with duplicate keys"
+
+    flags = np.random.randint(0, 2, size=5000)
+    picks = integer_rows(0, 0, 0, len(flags), len(QUANTITIES))
+    result = choose_on_condition(flags, 1, QUANTITIES, picks)
+    assert all(v == 0 for v in result[flags != 1])
+    assert set(result[flags == 1]) == set(QUANTITIES)
+    print("equivalence: ok")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run(num_rows):
+    ints = pd.Series(np.random.randint(0, 15, size=num_rows))
+    strs = pd.Series(np.random.choice(REPS, size=num_rows)).astype(str)
+    flags = pd.Series(np.random.randint(0, 2, size=num_rows))
+
+    cases = [
+        (
+            "reference_range",
+            lambda: legacy_reference_range(ints, RANGES, RANGE_VALUES),
+            lambda: lookup_reference_range(ints.to_numpy(), RANGES, RANGE_VALUES),
+        ),
+        (
+            "reference",
+            lambda: legacy_reference(strs, REPS, MANAGERS),
+            lambda: lookup_reference(strs, REPS, MANAGERS),
+        ),
+        (
+            "reference_boolean2",
+            lambda: legacy_choose_on_condition(flags, 1, QUANTITIES),
+            lambda: choose_on_condition(
+                flags.to_numpy(),
+                1,
+                QUANTITIES,
+                integer_rows(0, 0, 0, num_rows, len(QUANTITIES)),
+            ),
+        ),
+    ]
+    print(f"\n{num_rows:,} rows")
+    print(f"{'source':<20}{'per-row (s)':>14}{'vectorized (s)':>16}{'speedup':>10}")
+    for name, legacy, vectorized in cases:
+        before = timed(legacy)
+        after = timed(vectorized)
+        print(f"{name:<20}{before:>14.3f}{after:>16.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or [100_000, 10_000_000]
+    check_equivalence()
+    for size in sizes:
+        run(size)
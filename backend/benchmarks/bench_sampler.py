@@ -0,0 +1,85 @@
+"""
+Benchmark for weighted `random` columns with large option lists.
+
+Compares drawing every block with rng.choice(options, p=p), as before,
+against the Sampler prepared at compile time, checks that both give the
+same rows, then times them and a full compile + generate of a column whose
+options come from an options_file.
+
+    python benchmarks/bench_sampler.py                   # 50000 options, 1e6 rows
+    python benchmarks/bench_sampler.py 1000000 100000    # rows, options
+"""
+
+import configparser
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import generate_data  # noqa: E402
+from fakerengine.plan import compile_plan  # noqa: E402
+from fakerengine.rng import draw_rows, make_sampler  # noqa: E402
+
+SEED = 0
+KEY = 1
+
+
+def legacy_choice(options, p, num_rows):
+    return draw_rows(
+        SEED,
+        KEY,
+        0,
+        num_rows,
+        lambda rng, size: rng.choice(options, size=size, p=p),
+    )
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(num_rows, num_options):
+    options = np.array([f"SKU-{i:06d}" for i in range(num_options)], dtype=object)
+    weights = np.random.default_rng(1).integers(1, 100, num_options)
+    p = tuple(weights / weights.sum())
+
+    build, sampler = timed(lambda: make_sampler(num_options, p))
+    before, expected = timed(lambda: legacy_choice(options, p, num_rows))
+    after, picks = timed(lambda: options[sampler.rows(SEED, KEY, 0, num_rows)])
+    assert (picks == expected).all(), "sampler draws differ from rng.choice"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "skus.csv")
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(zip(options, weights))
+        config = configparser.ConfigParser()
+        config.read_dict(
+            {
+                "rec": {"num": str(num_rows), "seed": str(SEED)},
+                "c1": {"name": "SKU", "data": "random", "options_file": path},
+            }
+        )
+        compile_seconds, _ = timed(lambda: compile_plan(config))
+        generate_data(config, 1000)  # import pandas, warm the allocator
+        generate_seconds, _ = timed(lambda: generate_data(config))
+
+    print(f"\n{num_rows:,} rows, {num_options:,} weighted options")
+    print(f"{'rng.choice per block':<28}{before:>10.3f} s")
+    print(f"{'Sampler (+ build)':<28}{after:>10.3f} s  (+{build:.3f} s)")
+    print(f"{'speedup':<28}{before / after:>10.1f}x")
+    print(f"{'options_file compile':<28}{compile_seconds:>10.3f} s")
+    print(f"{'options_file generate':<28}{generate_seconds:>10.3f} s")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+    num_rows = args[0] if args else 1_000_000
+    num_options = args[1] if len(args) > 1 else 50_000
+    run(num_rows, num_options)
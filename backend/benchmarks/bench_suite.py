@@ -0,0 +1,443 @@
+"""
+Benchmark suite with a saved baseline and regression check.
+
+Scenarios:
+    startup:<cmd>   cold start of a fresh interpreter: `import` of
+                    fakerengine.fakerdata, the API app (`api`), `--help` and
+                    `--validate` of the CLI; a start counts as one row, and
+                    importing pandas, numpy or Faker where they are not
+                    needed is reported as a regression
+    source:<data>   one [cX] column per data source (random, company,
+                    increment, faker, reference, ...), timed on its own
+                    through the profiler, so the columns it reads do not count
+    append:<rule>   one [aX] rule (replace, generate random/faker, nullable)
+    rules.ini:<n>   the shipped rules.ini end to end, written to CSV, in a
+                    fresh process so peak RSS belongs to that run alone
+
+Each scenario records rows/sec (best of --repeat runs) and peak memory:
+tracemalloc peak for source/append scenarios, peak RSS for rules.ini.
+
+    python benchmarks/bench_suite.py                            # run, print
+    python benchmarks/bench_suite.py --save baseline.json       # record baseline
+    python benchmarks/bench_suite.py --compare baseline.json    # exit 1 on regression
+    python benchmarks/bench_suite.py --only source: --rows 1e6 --sizes 1e4
+
+A scenario regresses when its throughput drops, or its peak memory grows,
+by more than --max-regression / --max-memory-regression (fractions).
+Baselines are only comparable on the same machine.
+"""
+
+import argparse
+import configparser
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fakerengine.fakerdata import build_chunk, iter_chunks  # noqa: E402
+from fakerengine.profiling import Profile  # noqa: E402
+from fakerengine.writers import write_chunks  # noqa: E402
+
+RULES_PATH = os.path.join(os.path.dirname(BACKEND_DIR), "rules.ini")
+CLI_PATH = os.path.join(BACKEND_DIR, "fakerengine", "fakerdata.py")
+
+# Cold-start commands, and the heavy modules each must not import
+STARTUPS = {
+    "import": (["-c", "import fakerengine.fakerdata"], ("pandas", "numpy", "faker")),
+    "api": (["-c", "import main"], ("pandas", "numpy", "faker")),
+    "help": ([CLI_PATH, "--help"], ("pandas", "numpy", "faker")),
+    # Compiling the plan builds numpy arrays, but needs nothing else
+    "validate": ([CLI_PATH, "--config", RULES_PATH, "--validate"], ("pandas", "faker")),
+}
+
+REPS = ",".join(f"Rep_{i}" for i in range(1, 13))
+MANAGERS = ",".join(f"Manager_{i % 4}" for i in range(1, 13))
+
+# Column read by the dependent sources
+BASE_COLUMNS = {
+    "c1": {"name": "Rep", "data": "random", "options": REPS},
+    "c2": {"name": "Flag", "dtype": "int", "data": "random", "options": "1,0"},
+    "c3": {
+        "name": "Quantity",
+        "dtype": "int",
+        "data": "random",
+        "options": "1,2,3,4,5,6,7,8,9,10,11,12",
+    },
+    "c4": {"name": "Price", "dtype": "decimal", "data": "random", "options": "9.5,20"},
+}
+
+# Section under test is always c9 / a1
+SOURCES = {
+    "random": {
+        "data": "random",
+        "options": "Website,Call,Tradeshow,Social Media,Conference",
+        "weights": "25,25,25,20,30",
+    },
+    "company": {"dtype": "int", "data": "company"},
+    "increment": {"dtype": "int", "data": "increment", "start": "100", "interval": "5"},
+    "faker": {"data": "faker", "faker_method": "name"},
+    "faker_pool": {"data": "faker", "faker_method": "company", "pool": "5000"},
+    "reference": {"data": "reference", "cols": "1", "value": REPS, "range": MANAGERS},
+    "reference_range": {
+        "data": "reference_range",
+        "cols": "3",
+        "range": "3,6,9",
+        "value": "Low,Medium,High,Top",
+    },
+    "reference_boolean": {
+        "dtype": "int",
+        "data": "reference_boolean",
+        "cols": "2",
+        "value": "1,0",
+        "condition": "1",
+    },
+    "reference_boolean2": {
+        "dtype": "int",
+        "data": "reference_boolean2",
+        "cols": "2",
+        "value": "1,2,3,4,5",
+        "condition": "1",
+    },
+    "total": {
+        "dtype": "decimal",
+        "data": "total",
+        "operation": "*",
+        "operands": "c3,c4",
+    },
+    "discount": {
+        "dtype": "decimal",
+        "data": "discount",
+        "cols": "4",
+        "operation": "-",
+        "value": "10",
+    },
+    "conditional_random": {
+        "data": "conditional_random",
+        "cols": "1",
+        "options": "Website,Call,Referral",
+        "weight_table": "Rep_1: 6,3,1; Rep_2: 1,1,8; *: 1,1,1",
+    },
+    "normal": {"data": "normal", "mean": "100", "std": "15", "min": "0"},
+    "date_range": {"data": "date_range", "start": "2020-01-01", "end": "2024-12-31"},
+    "timestamp": {
+        "data": "timestamp",
+        "start": "2024-01-01",
+        "end": "2024-12-31",
+        "precision": "ms",
+    },
+}
+
+APPENDS = {
+    "replace": {
+        "operation": "replace",
+        "cols": "1",
+        "col_name": "Sales_Rep",
+        "find": "Rep_1,Rep_2,Rep_3",
+        "replace": "Alice,Bob,Carol",
+    },
+    "generate_random": {
+        "operation": "generate",
+        "data": "random",
+        "new_col": "Customer_Type",
+        "options": "Enterprise,SMB,Individual",
+        "weights": "40,40,20",
+    },
+    "generate_faker": {
+        "operation": "generate",
+        "data": "faker",
+        "new_col": "Customer_Name",
+        "faker_method": "company",
+        "pool": "5000",
+    },
+    "nullable": {
+        "operation": "generate",
+        "data": "random",
+        "new_col": "Segment",
+        "options": "A,B,C",
+        "nullable": "0.1",
+    },
+}
+
+# Per-row Faker is orders of magnitude slower than everything else
+ROW_DIVISORS = {"source:faker": 100}
+
+
+def scenario_config(name, num_rows):
+    kind, key = name.split(":")
+    config = configparser.ConfigParser()
+    sections = {"rec": {"num": str(num_rows), "mode": "1", "seed": "0"}}
+    sections.update(BASE_COLUMNS)
+    if kind == "source":
+        sections["c9"] = dict(SOURCES[key], name=key)
+    else:
+        sections["rec"]["mode"] = "2"
+        sections["a1"] = APPENDS[key]
+    config.read_dict(sections)
+    return config
+
+
+def section_of(name):
+    return "c9" if name.startswith("source:") else "a1"
+
+
+def profile_run(name, num_rows, memory):
+    """
+    Build the scenario once and return the profile entry of its section
+    """
+    config = scenario_config(name, num_rows)
+    profile = Profile(memory=memory)
+    build_chunk(config, profile=profile)
+    profile.close()
+    return profile.columns[section_of(name)]
+
+
+def run_profiled(name, num_rows, repeat, memory):
+    num_rows = max(1, num_rows // ROW_DIVISORS.get(name, 1))
+    profile_run(name, num_rows, False)  # warm caches, pools and the allocator
+    seconds = min(profile_run(name, num_rows, False)["seconds"] for _ in range(repeat))
+    peak = profile_run(name, num_rows, True)["peak_bytes"] if memory else None
+    return {"rows": num_rows, "seconds": seconds, "peak_bytes": peak}
+
+
+def end_to_end(num_rows):
+    """
+    Runs in a fresh worker process: generate rules.ini and write it to CSV
+    """
+    config = configparser.ConfigParser()
+    config.read(RULES_PATH)
+    config["rec"]["num"] = str(num_rows)
+    config["rec"]["seed"] = "0"
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        write_chunks(iter_chunks(config), os.path.join(directory, "out.csv"), "csv")
+        seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024  # kilobytes on Linux
+    return seconds, peak
+
+
+def start_once(args):
+    """
+    Run one cold start; returns (seconds, top-level packages it imported)
+    """
+    start = time.perf_counter()
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1])
+    # -X importtime lines end with "| <indented module name>"
+    imported = {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in done.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    return seconds, imported
+
+
+def run_startup(name, repeat):
+    args, forbidden = STARTUPS[name.split(":")[1]]
+    start_once(args)  # warm the OS file cache
+    runs = [start_once(args) for _ in range(repeat)]
+    heavy = sorted(set(forbidden) & runs[0][1])
+    return {
+        "rows": 1,
+        "seconds": min(run[0] for run in runs),
+        "peak_bytes": None,
+        "heavy_imports": heavy,
+    }
+
+
+def run_end_to_end(num_rows, repeat):
+    runs = []
+    for _ in range(repeat):
+        # spawn, not fork: a forked child would inherit this process's peak RSS
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(end_to_end, num_rows).result())
+    seconds = min(run[0] for run in runs)
+    peak = min(run[1] for run in runs)
+    return {"rows": num_rows, "seconds": seconds, "peak_bytes": peak}
+
+
+def scenarios(sizes):
+    """
+    (name, rows) pairs; source/append scenarios take their rows from --rows
+    """
+    pairs = [(f"startup:{key}", None) for key in STARTUPS]
+    pairs += [(f"source:{key}", None) for key in SOURCES]
+    pairs += [(f"append:{key}", None) for key in APPENDS]
+    pairs += [(f"rules.ini:{size}", size) for size in sizes]
+    return pairs
+
+
+def run_suite(rows, sizes, repeat=5, memory=True, only=None):
+    results = {}
+    for name, size in scenarios(sizes):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        if name.startswith("startup:"):
+            try:
+                result = run_startup(name, repeat)
+            except RuntimeError as e:
+                # e.g. the API dependencies are not installed
+                print(f"{name:<28}skipped: {e}", flush=True)
+                continue
+        elif name.startswith("rules.ini"):
+            # A single long run is enough at the largest sizes
+            result = run_end_to_end(size, repeat if size <= 100_000 else 1)
+        else:
+            result = run_profiled(name, rows, repeat, memory)
+        result["rows_per_second"] = result["rows"] / result["seconds"]
+        results[name] = result
+        print_result(name, result)
+    return results
+
+
+def print_result(name, result, baseline=None, status=""):
+    peak = result["peak_bytes"]
+    line = (
+        f"{name:<28}{result['rows']:>10,}{result['rows_per_second']:>14,.0f}"
+        f"{peak / 2**20 if peak is not None else float('nan'):>12.1f}"
+    )
+    if name.startswith("startup:"):
+        line += f"  {result['seconds'] * 1000:.0f} ms"
+    if baseline is not None:
+        line += f"{baseline:>+10.0%}  {status}"
+    elif result.get("heavy_imports"):
+        line += f"  imports {', '.join(result['heavy_imports'])}"
+    print(line, flush=True)
+
+
+def print_header(extra=""):
+    print(f"{'scenario':<28}{'rows':>10}{'rows/s':>14}{'peak MiB':>12}{extra}")
+
+
+def compare(results, baseline, max_regression, max_memory_regression):
+    """
+    Print the change against baseline per scenario and return the names of
+    the scenarios that regressed
+    """
+    print()
+    print_header(f"{'vs base':>10}")
+    failed = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print_result(name, result, 0.0, "new")
+            continue
+        change = result["rows_per_second"] / before["rows_per_second"] - 1
+        problems = []
+        if change < -max_regression:
+            problems.append("slower")
+        if result.get("heavy_imports"):
+            problems.append("imports " + ", ".join(result["heavy_imports"]))
+        if result["peak_bytes"] and before.get("peak_bytes"):
+            growth = result["peak_bytes"] / before["peak_bytes"] - 1
+            if growth > max_memory_regression:
+                problems.append(f"memory {growth:+.0%}")
+        if problems:
+            failed.append(name)
+        print_result(
+            name,
+            result,
+            change,
+            "REGRESSION " + ", ".join(problems) if problems else "ok",
+        )
+    return failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--rows",
+        type=float,
+        default=1_000_000,
+        help="rows per source/append scenario (default 1e6)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1e4,1e5,1e6",
+        help="comma-separated row counts for the rules.ini runs (default 1e4,1e5,1e6)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="runs per scenario, best kept"
+    )
+    parser.add_argument(
+        "--only",
+        help="comma-separated scenario prefixes to run, e.g. source:,append:replace",
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="skip the tracemalloc pass of source/append scenarios",
+    )
+    parser.add_argument("--save", metavar="PATH", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="allowed drop in rows/sec before failing (default 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--max-memory-regression",
+        type=float,
+        default=0.25,
+        help="allowed growth in peak memory before failing (default 0.25 = 25%%)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(float(size)) for size in args.sizes.split(",") if size]
+    only = args.only.split(",") if args.only else None
+
+    print_header()
+    results = run_suite(int(args.rows), sizes, args.repeat, args.memory, only)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failed = compare(
+            results, baseline, args.max_regression, args.max_memory_regression
+        )
+        if failed:
+            print(f"\n{len(failed)} scenario(s) regressed: {', '.join(failed)}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
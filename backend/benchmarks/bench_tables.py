@@ -0,0 +1,126 @@
+"""
+Benchmark for multi-table ([tables]) generation.
+
+Generates companies -> leads (1-5 per company) -> orders, with foreign keys
+drawn from the parents' saved key arrays, and compares it with generating
+the tables separately and fixing the keys up afterwards with pandas
+merges. Checks that every foreign key exists in its parent.
+
+    python benchmarks/bench_tables.py              # 1e5 companies
+    python benchmarks/bench_tables.py 1e6
+"""
+
+import configparser
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import build_dataframe  # noqa: E402
+from fakerengine.relational import build_tables  # noqa: E402
+
+SEED = 0
+
+
+def make_config(num_companies):
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "tables": {"names": "companies,leads,orders", "seed": str(SEED)},
+            "companies.rec": {"num": str(num_companies)},
+            "companies.c1": {"name": "Company_ID", "dtype": "int", "data": "company"},
+            "companies.c2": {"name": "Region", "options": "North,South,East,West"},
+            "leads.rec": {},
+            "leads.c1": {"name": "Lead_ID", "dtype": "int", "data": "company"},
+            "leads.c2": {
+                "name": "Company_ID",
+                "data": "foreign_key",
+                "table": "companies",
+                "column": "Company_ID",
+                "children": "1-5",
+            },
+            "orders.rec": {"num": str(num_companies * 5)},
+            "orders.c1": {"name": "Order_ID", "dtype": "int", "data": "company"},
+            "orders.c2": {
+                "name": "Lead_ID",
+                "data": "foreign_key",
+                "table": "leads",
+                "column": "Lead_ID",
+            },
+            "orders.c3": {"name": "Amount", "data": "lognormal", "mean": "6"},
+        }
+    )
+    return config
+
+
+def single_table(sections, num):
+    config = configparser.ConfigParser()
+    config.read_dict({"rec": {"num": str(num), "seed": str(SEED)}, **sections})
+    return build_dataframe(config)
+
+
+def separately(num_companies):
+    """
+    The old way: one run per table, then keys assigned and joined in pandas
+    """
+    rng = np.random.default_rng(SEED)
+    companies = single_table(
+        {
+            "c1": {"name": "Company_ID", "dtype": "int", "data": "company"},
+            "c2": {"name": "Region", "options": "North,South,East,West"},
+        },
+        num_companies,
+    )
+    counts = rng.integers(1, 6, num_companies)
+    parents = pd.DataFrame({"Company_ID": np.repeat(companies["Company_ID"], counts)})
+    leads = single_table(
+        {"c1": {"name": "Lead_ID", "dtype": "int", "data": "company"}},
+        int(counts.sum()),
+    )
+    leads = pd.concat([leads, parents.reset_index(drop=True)], axis=1)
+    leads = leads.merge(companies[["Company_ID"]], on="Company_ID")
+    orders = single_table(
+        {
+            "c1": {"name": "Order_ID", "dtype": "int", "data": "company"},
+            "c3": {"name": "Amount", "data": "lognormal", "mean": "6"},
+        },
+        num_companies * 5,
+    )
+    orders["Lead_ID"] = leads["Lead_ID"].to_numpy()[
+        rng.integers(0, len(leads), len(orders))
+    ]
+    orders = orders.merge(leads[["Lead_ID"]], on="Lead_ID")
+    return {"companies": companies, "leads": leads, "orders": orders}
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(num_companies):
+    build_tables(make_config(1000))  # import pandas, warm up
+    before, _ = timed(lambda: separately(num_companies))
+    after, tables = timed(lambda: build_tables(make_config(num_companies)))
+
+    leads, orders = tables["leads"], tables["orders"]
+    assert leads["Company_ID"].isin(tables["companies"]["Company_ID"]).all()
+    assert orders["Lead_ID"].isin(leads["Lead_ID"]).all()
+    per_company = leads.groupby("Company_ID").size()
+    assert per_company.between(1, 5).all() and len(per_company) == num_companies
+
+    rows = sum(len(df) for df in tables.values())
+    print(
+        f"\n{num_companies:,} companies, {len(leads):,} leads, {len(orders):,} orders"
+    )
+    print(f"{'separate runs + merges':<26}{before:>10.3f} s")
+    print(f"{'[tables]':<26}{after:>10.3f} s{rows / after / 1e6:>8.1f} M rows/s")
+
+
+if __name__ == "__main__":
+    run(int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,92 @@
+"""
+Benchmark for `unique = true` columns.
+
+Times Faker's `fake.unique` proxy, which remembers every value in a set and
+retries each row until it finds a new one, against a unique faker column
+(pool + seeded permutation, suffixes once the pool runs out) and a unique
+random column with a large option list. Checks that the unique columns
+have no duplicates when generated in chunks and in parallel shards.
+
+    python benchmarks/bench_unique.py              # 1e5 rows
+    python benchmarks/bench_unique.py 1e6 20000    # rows, faker pool
+"""
+
+import configparser
+import os
+import sys
+import time
+
+import pandas as pd
+from faker import Faker
+from faker.exceptions import UniquenessException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.fakerdata import (  # noqa: E402
+    build_chunk,
+    iter_chunks,
+    iter_parallel_chunks,
+)
+
+SEED = 0
+CHUNK_SIZE = 25_000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def faker_unique(num_rows):
+    fake = Faker()
+    fake.seed_instance(SEED)
+    try:
+        return [fake.unique.first_name() for _ in range(num_rows)]
+    except UniquenessException:
+        return None
+
+
+def make_config(num_rows, pool):
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "rec": {"num": str(num_rows), "seed": str(SEED)},
+            "c1": {
+                "name": "First_Name",
+                "data": "faker",
+                "faker_method": "first_name",
+                "unique": "true",
+                "pool": str(pool),
+            },
+            "c2": {
+                "name": "Code",
+                "dtype": "int",
+                "options": ",".join(map(str, range(num_rows))),
+                "unique": "true",
+            },
+        }
+    )
+    return config
+
+
+def run(num_rows, pool):
+    before, names = timed(lambda: faker_unique(num_rows))
+    config = make_config(num_rows, pool)
+    build_chunk(make_config(1000, pool), 1000)  # import pandas, build the pool
+    after, df = timed(lambda: pd.concat(iter_chunks(config, CHUNK_SIZE)))
+    shards = pd.concat(iter_parallel_chunks(config, 2, CHUNK_SIZE))
+    assert df.equals(shards), "parallel shards differ from chunks"
+    assert df["First_Name"].is_unique and df["Code"].is_unique, "duplicates"
+
+    print(f"\n{num_rows:,} rows, first_name pool of {pool:,}")
+    status = "ran out of values" if names is None else "ok"
+    print(f"{'fake.unique per row':<28}{before:>10.3f} s  ({status})")
+    print(f"{'unique columns, chunked':<28}{after:>10.3f} s")
+    suffixed = df["First_Name"].str.contains("-").mean()
+    print(f"{'suffixed names':<28}{suffixed:>10.1%}")
+
+
+if __name__ == "__main__":
+    args = [int(float(arg)) for arg in sys.argv[1:]]
+    run(args[0] if args else 100_000, args[1] if len(args) > 1 else 5_000)
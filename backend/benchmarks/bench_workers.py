@@ -0,0 +1,56 @@
+"""
+Scaling benchmark for sharded generation across worker processes.
+
+Builds the shipped rules.ini with 1..N workers and reports wall time and
+speedup over a single process.
+
+    python benchmarks/bench_workers.py                  # 1e5 rows, up to cpu_count
+    python benchmarks/bench_workers.py 1000000 8        # rows, max workers
+"""
+
+import configparser
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fakerengine.fakerdata import build_dataframe  # noqa: E402
+
+RULES_PATH = os.path.join(os.path.dirname(BACKEND_DIR), "rules.ini")
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def run(num_rows, max_workers):
+    config = configparser.ConfigParser()
+    config.read(RULES_PATH)
+    config["rec"]["num"] = str(num_rows)
+
+    print(f"{num_rows:,} rows from {RULES_PATH}")
+    print(f"{'workers':>8}{'seconds':>10}{'rows/s':>14}{'speedup':>10}")
+    baseline = None
+    for workers in worker_counts(max_workers):
+        start = time.perf_counter()
+        df = build_dataframe(config, workers, seed=0)
+        elapsed = time.perf_counter() - start
+        assert len(df) == num_rows
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>8}{elapsed:>10.2f}{num_rows / elapsed:>14,.0f}"
+            f"{baseline / elapsed:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    rows = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    run(rows, max_workers)
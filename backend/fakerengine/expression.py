@@ -0,0 +1,245 @@
+"""
+Arithmetic `expression` columns, e.g. `expr = (c13 - c8 * c9) * 0.18`.
+
+The expression is parsed once, when the plan is compiled, into a Python
+AST that is checked against a small whitelist: numbers, column references
+`cN`, + - * / // % **, comparisons, and the functions in FUNCTIONS. It is
+then evaluated column-wise on whole numpy arrays, never row by row. When
+numexpr is installed, expressions it understands are handed to it instead.
+
+Columns are read as floats, like `total` operands. A column compared with
+a string (`where(c14 == 'Win', c12, 0)`) is compared as text instead.
+"""
+
+import ast
+import math
+import operator
+import re
+from dataclasses import dataclass
+
+from fakerengine.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+COLUMN_NAME = re.compile(r"^c([1-9][0-9]*)$")
+
+BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+UNARY_OPS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+# name: (numpy function name, number of arguments)
+FUNCTIONS = {
+    "abs": ("abs", 1),
+    "sqrt": ("sqrt", 1),
+    "exp": ("exp", 1),
+    "log": ("log", 1),
+    "floor": ("floor", 1),
+    "ceil": ("ceil", 1),
+    "round": ("round", 2),
+    "min": ("minimum", 2),
+    "max": ("maximum", 2),
+    "clip": ("clip", 3),
+    "where": ("where", 3),
+}
+
+# What numexpr evaluates the same way; anything else stays with numpy
+NUMEXPR_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.Call,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+    *UNARY_OPS,
+    *COMPARE_OPS,
+)
+NUMEXPR_FUNCTIONS = {"abs", "sqrt", "exp", "log", "where"}
+# Below this many rows numexpr's start-up costs more than it saves
+NUMEXPR_MIN_ROWS = 100_000
+
+
+def import_numexpr():
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
+
+
+@dataclass(frozen=True)
+class Expression:
+    text: str
+    tree: ast.Expression
+    columns: tuple  # referenced column numbers (1-based), in order
+    numexpr: bool = False
+
+
+def is_float(value):
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def check_node(node, columns, text=False):
+    """
+    Reject anything outside the whitelist; collect referenced columns.
+    Strings are only allowed directly in a comparison (text=True).
+    """
+    if isinstance(node, ast.Expression):
+        check_node(node.body, columns)
+    elif isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPS:
+        check_node(node.left, columns)
+        check_node(node.right, columns)
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        check_node(node.operand, columns)
+    elif isinstance(node, ast.Compare):
+        if len(node.ops) != 1 or type(node.ops[0]) not in COMPARE_OPS:
+            raise ValueError("only single comparisons such as c1 > 5 are supported")
+        check_node(node.left, columns, text=True)
+        check_node(node.comparators[0], columns, text=True)
+    elif isinstance(node, ast.Constant):
+        if isinstance(node.value, str):
+            if not text:
+                raise ValueError(
+                    f"string {node.value!r} can only be compared, e.g. c14 == 'Win'"
+                )
+        elif isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"unsupported constant {node.value!r}")
+        elif not is_float(node.value):
+            raise ValueError(f"number {node.value} is too large")
+    elif isinstance(node, ast.Name):
+        match = COLUMN_NAME.match(node.id)
+        if not match:
+            raise ValueError(f"unknown name '{node.id}', use c1, c2, ...")
+        if int(match.group(1)) not in columns:
+            columns.append(int(match.group(1)))
+    elif isinstance(node, ast.Call):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in FUNCTIONS or node.keywords:
+            raise ValueError(
+                f"unknown function, use one of {', '.join(sorted(FUNCTIONS))}"
+            )
+        if len(node.args) != FUNCTIONS[name][1]:
+            raise ValueError(f"{name}() takes {FUNCTIONS[name][1]} arguments")
+        if name == "round" and not (
+            isinstance(node.args[1], ast.Constant) and type(node.args[1].value) is int
+        ):
+            raise ValueError(
+                "round() takes a whole number of decimals, e.g. round(c1, 2)"
+            )
+        for arg in node.args:
+            check_node(arg, columns)
+    else:
+        raise ValueError(f"'{ast.unparse(node)}' is not allowed in an expression")
+
+
+def has_columns(node):
+    return any(isinstance(child, ast.Name) for child in ast.walk(node))
+
+
+def fits_numexpr(tree):
+    for node in ast.walk(tree):
+        # numexpr folds constants with Python ints: 9 ** 9 ** 9 never ends
+        if isinstance(node, ast.BinOp) and not has_columns(node):
+            return False
+        if not isinstance(node, NUMEXPR_NODES):
+            return False
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return False
+        if isinstance(node, ast.Call) and node.func.id not in NUMEXPR_FUNCTIONS:
+            return False
+    return True
+
+
+def parse_expression(text):
+    """
+    Parse and check an expression; raises ValueError if it is not allowed
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression '{text}': {e.msg}") from e
+    columns = []
+    check_node(tree, columns)
+    return Expression(
+        text=text.strip(),
+        tree=tree,
+        columns=tuple(columns),
+        numexpr=import_numexpr() is not None and fits_numexpr(tree),
+    )
+
+
+def is_text(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+
+def evaluate_node(node, columns, numeric=True):
+    if isinstance(node, ast.Expression):
+        return evaluate_node(node.body, columns)
+    if isinstance(node, ast.Constant):
+        # As float64, so constant arithmetic cannot grow like Python ints
+        return node.value if is_text(node) else np.float64(node.value)
+    if isinstance(node, ast.Name):
+        values = np.asarray(columns[node.id])
+        return values.astype(float) if numeric else values.astype(str)
+    if isinstance(node, ast.BinOp):
+        return BINARY_OPS[type(node.op)](
+            evaluate_node(node.left, columns), evaluate_node(node.right, columns)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPS[type(node.op)](evaluate_node(node.operand, columns))
+    if isinstance(node, ast.Compare):
+        right = node.comparators[0]
+        # Compare as text when either side is a string literal
+        numeric = not (is_text(node.left) or is_text(right))
+        return COMPARE_OPS[type(node.ops[0])](
+            evaluate_node(node.left, columns, numeric),
+            evaluate_node(right, columns, numeric),
+        )
+    # ast.Call
+    function = getattr(np, FUNCTIONS[node.func.id][0])
+    args = [evaluate_node(arg, columns) for arg in node.args]
+    if node.func.id == "round":
+        args[1] = node.args[1].value
+    return function(*args)
+
+
+def evaluate_expression(expression, columns, num_records):
+    """
+    Evaluate expression over whole columns; columns maps "cN" to the
+    generated array of column N
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if expression.numexpr and num_records >= NUMEXPR_MIN_ROWS:
+            local_dict = {
+                name: np.asarray(values).astype(float)
+                for name, values in columns.items()
+            }
+            data = import_numexpr().evaluate(expression.text, local_dict=local_dict)
+        else:
+            data = evaluate_node(expression.tree, columns)
+    # Constant expressions give a scalar
+    return np.broadcast_to(data, (num_records,))
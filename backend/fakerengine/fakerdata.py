@@ -1,287 +1,1069 @@
+import argparse
 import configparser
 import csv
 import datetime
-import random
-import pandas as pd
-from faker import Faker
-import numpy as np
 import tempfile
 import os
+import uuid
 import io
 import json
+import sys
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ""):
+    # Running this file directly: make the fakerengine package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakerengine.lazy import lazy_import
+from fakerengine.copula import correlated_normals, marginal_values
+from fakerengine.expression import evaluate_expression
+from fakerengine.lookup import lookup_values
+from fakerengine.plan import (
+    DISTRIBUTIONS,
+    UNIQUE_POOL_SIZE,
+    column_storage,
+    compile_plan,
+    is_compact,
+    parse_column_definitions,
+)
+from fakerengine.profiling import Profile, profiled_column, profiled_stage
+from fakerengine.writers import (
+    COMPRESSIONS,
+    DEFAULT_COMPRESSION,
+    WRITERS,
+    default_output,
+    guess_format,
+    normalize_compression,
+    write_chunks,
+)
+from fakerengine.rng import (
+    draw_rows,
+    integer_rows,
+    new_seed,
+    permuted_rows,
+    stream_key,
+    uniform_rows,
+)
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100000
+# Number of faker value pools kept in memory, least recently used dropped first
+POOL_CACHE_SIZE = 32
+
+# Faker instances are reseeded before values are drawn, so each thread
+# (e.g. concurrent API requests) needs its own
+_fakers = threading.local()
+_pool_cache = OrderedDict()
+_pool_lock = threading.Lock()
+
+
+def get_faker(locale=None):
+    """
+    Return this thread's Faker instance for locale (None = Faker's default),
+    created on first use and reused afterwards.
+    """
+    fakers = _fakers.__dict__
+    if locale not in fakers:
+        from faker import Faker
+
+        fakers[locale] = Faker(locale)
+    return fakers[locale]
+
+
+def build_faker_pool(method, size, locale=None):
+    """
+    Call a Faker method until size distinct values are collected.
+    Methods with a smaller value space stop early with a smaller pool.
+    Pools are seeded from (method, locale, size) so they are the same in
+    every run and process, and safe to cache on disk.
+    """
+    faker = get_faker(locale)
+    faker.seed_instance(stream_key(f"{method}:{locale}:{size}"))
+    func = getattr(faker, method) if hasattr(faker, method) else faker.name
+    values = {}
+    attempts = 0
+    while len(values) < size and attempts < size * 3:
+        values.setdefault(func(), None)
+        attempts += 1
+    return np.array(list(values), dtype=object)
+
 
-fake = Faker()
+def pool_key(method, size, locale=None):
+    return (method, locale or "default", size)
 
 
-def parse_column_definitions(config):
-    defs = []
+def save_pool(pool, stem):
+    """
+    Cache a pool on disk in a format that gives back the same values: text
+    as JSON, numbers as .npy. Pools of other values (dates, Decimals) are
+    only kept in memory, since neither format keeps their type.
+    """
+    types = {type(value) for value in pool}
+    if types <= {str}:
+        path, data = stem + ".json", json.dumps(pool.tolist()).encode()
+    elif len(types) == 1 and types <= {int, float, bool}:
+        values = np.array(pool.tolist())
+        if values.dtype.kind not in "iufb":
+            return
+        buffer = io.BytesIO()
+        np.save(buffer, values)
+        path, data = stem + ".npy", buffer.getvalue()
+    else:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write under a unique name and rename, so readers never see a partial file
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def read_cached_pool(stem):
+    if os.path.exists(stem + ".json"):
+        with open(stem + ".json") as f:
+            return np.array(json.load(f), dtype=object)
+    if os.path.exists(stem + ".npy"):
+        # Back to Python numbers, as a freshly built pool holds
+        return np.load(stem + ".npy", allow_pickle=False).astype(object)
+    return None
+
+
+def get_faker_pool(method, size, locale=None, cache_dir=None):
+    """
+    Return a pool of distinct Faker values from the in-memory LRU cache,
+    the on-disk cache in cache_dir, or by generating it.
+    """
+    key = pool_key(method, size, locale)
+    with _pool_lock:
+        if key in _pool_cache:
+            _pool_cache.move_to_end(key)
+            return _pool_cache[key]
+
+    stem = None
+    if cache_dir:
+        stem = os.path.join(cache_dir, "faker_pool_{}_{}_{}".format(*key))
+    pool = read_cached_pool(stem) if stem else None
+    if pool is None:
+        pool = build_faker_pool(method, size, locale)
+        if stem:
+            save_pool(pool, stem)
+
+    with _pool_lock:
+        _pool_cache[key] = pool
+        if len(_pool_cache) > POOL_CACHE_SIZE:
+            _pool_cache.popitem(last=False)
+    return pool
+
+
+def faker_sources(config, plan):
+    """
+    (section, method, pool, locale) of every faker column and [aX] faker
+    rule that reaches the output; pool is the size of the value pool it
+    draws from, 0 for per-row values
+    """
+    dead = set(plan.dead)
+    sources = [
+        (
+            col.section,
+            col.faker_method,
+            col.pool or (UNIQUE_POOL_SIZE if col.unique else 0),
+            col.locale,
+        )
+        for col in plan.columns
+        if col.data == "faker" and col.index not in dead
+    ]
+    pruned = set(plan.pruned_appends)
     for section in config.sections():
-        if section.startswith("c"):
-            col = config[section]
-            col_def = {
-                "name": col.get("name", section),
-                "dtype": col.get("dtype", "str"),
-                "data": col.get("data", "random"),
-                "options": (
-                    col.get("options", "").split(",") if "options" in col else None
-                ),
-                "weights": (
-                    [int(w) for w in col.get("weights", "1").split(",")]
-                    if "weights" in col
-                    else None
-                ),
-                "range": (col.get("range", "").split(",") if "range" in col else None),
-                "value": col.get("value", "").split(",") if "value" in col else None,
-                "cols": int(col.get("cols", "0")),
-                "operation": col.get("operation"),
-                "operands": (
-                    col.get("operands", "").split(",") if "operands" in col else None
-                ),
-                "faker_method": col.get("faker_method", "name"),
-                "condition": col.get("condition"),
-                "start": col.get("start"),
-                "interval": col.get("interval"),
-            }
-            defs.append(col_def)
-    return defs
-
-
-def generate_data(config):
-    num_records = int(config["rec"]["num"])
-    column_defs = parse_column_definitions(config)
-    df = pd.DataFrame()
-
-    for col_def in column_defs:
-        name = col_def["name"]
-        dtype = col_def["dtype"]
-        data_source = col_def["data"]
-
-        if data_source == "company":
-            data = np.arange(1, num_records + 1)
-
-        elif data_source == "random":
-            options = col_def["options"]
-            weights = col_def["weights"]
-            if weights:
-                data = np.random.choice(
-                    options, size=num_records, p=np.array(weights) / sum(weights)
+        rule = config[section]
+        if (
+            section.startswith("a")
+            and section not in pruned
+            and rule.get("operation") == "generate"
+            and rule.get("data") == "faker"
+        ):
+            sources.append(
+                (
+                    section,
+                    rule.get("faker_method", "name"),
+                    int(rule.get("pool", 0)),
+                    rule.get("locale", config["rec"].get("locale")),
                 )
-            else:
-                data = np.random.choice(options, size=num_records)
+            )
+    return sources
 
-        elif data_source == "faker":
-            method = col_def["faker_method"]
-            if hasattr(fake, method):
-                data = [getattr(fake, method)() for _ in range(num_records)]
-            else:
-                data = [fake.name() for _ in range(num_records)]
 
-        elif data_source == "increment":
-            start = int(col_def["start"]) if col_def["start"] else 1
-            interval = int(col_def["interval"]) if col_def["interval"] else 1
-            data = np.arange(start, start + interval * num_records, interval)
+def load_pools(config):
+    """
+    Every faker pool the output of config draws from, by pool_key
+    """
+    cache_dir = config["rec"].get("pool_cache")
+    return {
+        pool_key(method, pool, locale): get_faker_pool(method, pool, locale, cache_dir)
+        for _, method, pool, locale in faker_sources(config, compile_plan(config))
+        if pool
+    }
 
-        elif data_source in [
-            "reference",
-            "reference_range",
-            "reference_boolean",
-            "reference_boolean2",
-        ]:
-            # Placeholder, process after base columns are filled
-            data = [None] * num_records
 
-        elif data_source in ["total", "discount"]:
-            data = [None] * num_records
+def preload_pools(pools):
+    """
+    Worker process initializer: start with the pools built by the parent
+    """
+    _pool_cache.update(pools)
+
+
+def faker_values(
+    method,
+    num_records,
+    seed,
+    key,
+    offset=0,
+    pool=0,
+    locale=None,
+    cache_dir=None,
+):
+    """
+    Generate Faker values for rows [offset, offset + num_records) of stream key.
+    With pool > 0 the values are sampled from a cached pool of that many
+    distinct values instead of calling Faker once per row. Without a pool,
+    Faker is reseeded per row so each value depends only on (seed, key, row).
+    """
+    if pool > 0:
+        values = get_faker_pool(method, pool, locale, cache_dir)
+        return values[integer_rows(seed, key, offset, num_records, len(values))]
 
-        else:
-            data = [None] * num_records
-
-        df[name] = data
-
-    # Post-process dependent columns
-    for col_def in column_defs:
-        name = col_def["name"]
-        data_source = col_def["data"]
-
-        if data_source == "reference_range":
-            ref_col = column_defs[col_def["cols"] - 1]["name"]
-            values = col_def["value"]
-            ranges = col_def["range"]
-            ref_vals = df[ref_col].astype(int)
-            df[name] = ref_vals.apply(
-                lambda val: next(
-                    (v for r, v in zip(ranges, values) if val <= int(r)), values[-1]
+    faker = get_faker(locale)
+    func = getattr(faker, method) if hasattr(faker, method) else faker.name
+    row_seeds = integer_rows(seed, key, offset, num_records, 2**63)
+    data = []
+    for row_seed in row_seeds.tolist():
+        faker.seed_instance(row_seed)
+        data.append(func())
+    return data
+
+
+def add_suffixes(values, levels):
+    """
+    Append -2, -3, ... to values with level 1, 2, ...; level 0 values are
+    left as they are. In e-mail addresses the suffix goes before the @.
+    """
+    values = np.array(values, dtype=object)
+    mask = levels > 0
+    if mask.any():
+        parts = np.char.partition(values[mask].astype(str), "@")
+        numbers = (levels[mask] + 1).astype(str)
+        suffixed = parts[:, 0]
+        for part in ("-", numbers, parts[:, 1], parts[:, 2]):
+            suffixed = np.char.add(suffixed, part)
+        values[mask] = suffixed
+    return values
+
+
+def unique_pool(col, cache_dir=None):
+    """
+    Distinct values a unique column draws from: its options, or a faker pool
+    of `pool` values (UNIQUE_POOL_SIZE without one)
+    """
+    if col.data == "random":
+        return col.options
+    return get_faker_pool(
+        col.faker_method, col.pool or UNIQUE_POOL_SIZE, col.locale, cache_dir
+    )
+
+
+def check_unique_pools(plan, total_records, cache_dir=None):
+    """
+    Fail before generating anything when a unique column that cannot take
+    suffixes has a faker pool with fewer distinct values than rows: a
+    method with a small value space stops its pool early
+    """
+    dead = set(plan.dead)
+    for col in plan.columns:
+        if (
+            col.unique
+            and col.options is None
+            and col.storage != "object"
+            and col.index not in dead
+        ):
+            size = len(unique_pool(col, cache_dir))
+            if total_records > size:
+                raise ValueError(
+                    f"[{col.section}] {col.name}: unique needs [rec] num = "
+                    f"{total_records} values but {col.faker_method} only gave "
+                    f"{size} distinct ones"
                 )
-            )
 
-        elif data_source == "reference":
-            ref_col = column_defs[col_def["cols"] - 1]["name"]
-            keys = col_def["value"]
-            values = col_def["range"]
-            mapping = dict(zip(keys, values))
-            df[name] = df[ref_col].astype(str).map(lambda v: mapping.get(v, values[-1]))
-
-        elif data_source == "reference_boolean":
-            ref_col = column_defs[col_def["cols"] - 1]["name"]
-            condition = int(col_def["condition"])
-            val_true, val_false = col_def["value"]
-            df[name] = np.where(df[ref_col] == condition, val_true, val_false)
-
-        elif data_source == "reference_boolean2":
-            ref_col = column_defs[col_def["cols"] - 1]["name"]
-            condition = int(col_def["condition"])
-            values = col_def["value"]
-            df[name] = df[ref_col].apply(
-                lambda v: random.choice(values) if int(v) == condition else 0
+
+def unique_values(col, values, num_records, offset, seed):
+    """
+    Distinct values for rows [offset, offset + num_records). Every block of
+    len(values) rows is a seeded permutation of the values, so rows never
+    repeat, whatever the chunking, worker shard or row count. The second
+    block gets the suffix -2, the third -3 and so on (string columns only).
+    """
+    size = len(values)
+    if size == 0 or (offset + num_records > size and col.storage != "object"):
+        raise ValueError(
+            f"[{col.section}] {col.name}: unique needs {offset + num_records} "
+            f"values but there are only {size} distinct ones"
+        )
+    positions = permuted_rows(seed, col.key, offset, num_records, size)
+    picks = np.asarray(values)[positions]
+    if offset + num_records <= size:
+        return picks
+    return add_suffixes(picks, np.arange(offset, offset + num_records) // size)
+
+
+def lookup_reference_range(ref_vals, ranges, values):
+    """
+    Map each value to the label of the first threshold it does not exceed.
+    Values above every threshold get the last label.
+    """
+    values = np.asarray(values)
+    pairs = min(len(ranges), len(values))
+    # A running maximum keeps "first threshold >= value" searchable even when
+    # the thresholds are not listed in ascending order.
+    thresholds = np.maximum.accumulate(
+        np.array([int(r) for r in ranges[:pairs]], dtype=np.int64)
+    )
+    labels = np.concatenate([values[:pairs], values[-1:]])
+    return labels[np.searchsorted(thresholds, ref_vals, side="left")]
+
+
+def lookup_reference(ref_vals, keys, values):
+    """
+    Map values, compared as strings, through keys -> values, falling back to
+    the last value. Only the distinct values are converted and looked up;
+    rows are filled by their codes.
+    """
+    values = np.asarray(values)
+    positions = {key: pos for pos, key in zip(range(len(values)), keys)}
+    codes, uniques = pd.factorize(ref_vals, use_na_sentinel=False)
+    table = np.array(
+        [positions.get(str(u), len(values) - 1) for u in uniques], dtype=int
+    )
+    return values[table[codes]]
+
+
+def parent_groups(ref_vals, keys):
+    """
+    Group index of each row: the position of its value, compared as a
+    string, in keys, or len(keys) for values not listed
+    """
+    positions = {key: pos for pos, key in enumerate(keys)}
+    codes, uniques = pd.factorize(ref_vals, use_na_sentinel=False)
+    table = np.array([positions.get(str(u), len(keys)) for u in uniques], dtype=int)
+    return table[codes]
+
+
+def choose_on_condition(ref_vals, condition, values, picks):
+    """
+    Use values[picks] for rows equal to condition, 0 for all other rows.
+    picks holds one random index into values per row.
+    """
+    values = np.asarray(values)
+    mask = ref_vals == condition
+    numeric = values.dtype.kind in "iuf"
+    data = np.zeros(len(ref_vals), dtype=values.dtype if numeric else object)
+    data[mask] = values[picks[mask]]
+    return data
+
+
+def get_seed(config, seed=None):
+    """
+    Resolve the run seed: explicit seed, then [rec] seed, then a fresh one
+    """
+    if seed is None:
+        seed = config["rec"].get("seed")
+    return new_seed() if seed is None else int(seed)
+
+
+def fill_missing(data, fill):
+    if data.dtype.kind in "fO":
+        missing = pd.isna(data)
+        if missing.any():
+            data = data.astype(object)
+            data[missing] = fill
+    return data
+
+
+def store_column(out, data, dtype, decimals=2):
+    """
+    Write generated data into the preallocated array out, converted to the
+    column dtype: missing values become 0 for numbers and "" for strings,
+    decimals are rounded to 2 places (or decimals).
+    """
+    data = np.asarray(data)
+    if out.dtype != object:
+        out[...] = fill_missing(data, 0)
+        if dtype in ["float", "float32", "decimal"]:
+            np.round(out, decimals, out=out)
+    elif (
+        data.dtype == object
+        and pd.api.types.infer_dtype(data, skipna=False) == "string"
+    ):
+        out[...] = data
+    else:
+        out[...] = fill_missing(data, "").astype(str)
+    return out
+
+
+def distribution_values(col, num_records, offset, seed):
+    """
+    Draw a uniform, normal, lognormal, poisson, date_range or timestamp
+    column straight into a numpy array
+    """
+    data_source = col.data
+    integer = col.unit is not None or col.storage.startswith("int")
+
+    if data_source == "uniform" and not integer:
+        draw = lambda rng, size: rng.uniform(col.minimum, col.maximum, size)
+    elif data_source in ("uniform", "date_range", "timestamp"):
+        draw = lambda rng, size: rng.integers(
+            col.minimum, col.maximum, size, endpoint=True
+        )
+    elif data_source == "normal":
+        draw = lambda rng, size: rng.normal(col.mean, col.std, size)
+    elif data_source == "lognormal":
+        draw = lambda rng, size: rng.lognormal(col.mean, col.std, size)
+    else:  # poisson
+        draw = lambda rng, size: rng.poisson(col.mean, size)
+
+    return shape_distribution(col, draw_rows(seed, col.key, offset, num_records, draw))
+
+
+def shape_distribution(col, values):
+    """
+    Clip drawn values to [min, max] and round them to the column's
+    precision (whole numbers for int columns); dates and timestamps are
+    converted from counts of their unit
+    """
+    integer = col.unit is not None or col.storage.startswith("int")
+    if col.unit is not None:
+        return values.astype(f"datetime64[{col.unit}]")
+    if col.minimum is not None or col.maximum is not None:
+        values = np.clip(values, col.minimum, col.maximum)
+    if integer:
+        return np.rint(values)
+    if col.precision is not None:
+        return np.round(values, col.precision)
+    return values
+
+
+def foreign_key_values(col, num_records, offset, seed):
+    """
+    Parent keys for rows [offset, offset + num_records) of a child table:
+    by position in child_starts when the parent decides the number of
+    children, else a uniformly random parent per row
+    """
+    if col.parent_keys is None:
+        raise ValueError(
+            f"[{col.section}] {col.name}: foreign_key columns are filled from "
+            "their parent table; generate them through a [tables] config"
+        )
+    if col.child_starts is not None:
+        rows = np.arange(offset, offset + num_records)
+        parents = col.child_starts.searchsorted(rows, side="right") - 1
+    else:
+        parents = integer_rows(seed, col.key, offset, num_records, len(col.parent_keys))
+    return np.asarray(col.parent_keys[parents])
+
+
+def generate_categorical(col, ref, num_records, offset, seed):
+    """
+    Compact string column: pick option/label positions as the plain column
+    would, and build the categorical straight from their codes
+    """
+    data_source = col.data
+    positions = np.arange(len(col.category_codes))
+
+    if data_source == "random":
+        picks = col.sampler.rows(seed, col.key, offset, num_records)
+    elif data_source == "conditional_random":
+        groups = parent_groups(ref, col.keys)
+        picks = col.grouped_sampler.rows(seed, col.key, offset, num_records, groups)
+    elif data_source == "reference_range":
+        picks = lookup_reference_range(ref.astype(int), col.thresholds, positions)
+    elif data_source == "reference":
+        picks = lookup_reference(ref, col.keys, positions)
+    else:  # reference_boolean
+        picks = np.where(ref == col.condition, 0, 1)
+
+    return pd.Categorical.from_codes(
+        col.category_codes[picks], categories=col.categories, validate=False
+    )
+
+
+def group_member_values(group, col, correlated, num_records, offset, seed):
+    """
+    Values of a member of a correlated [gX] group. The group's correlated
+    normals are drawn once per chunk, by its first member, and kept in
+    correlated for the other members.
+    """
+    if group.section not in correlated:
+        correlated[group.section] = correlated_normals(group, num_records, offset, seed)
+    normals = correlated[group.section][:, group.members.index(col.index)]
+    return shape_distribution(col, marginal_values(col, normals))
+
+
+def generate_column(col, results, num_records, offset, seed, cache_dir=None):
+    """
+    Generate one planned column; results holds the already generated column
+    arrays by index, which includes every column this one depends on.
+    """
+    data_source = col.data
+    ref = results[col.deps[0]] if col.deps else None
+
+    if col.unique:
+        values = unique_pool(col, cache_dir)
+        return unique_values(col, values, num_records, offset, seed)
+
+    if col.categories is not None:
+        return generate_categorical(col, ref, num_records, offset, seed)
+
+    if data_source == "company":
+        return np.arange(offset + 1, offset + num_records + 1)
+
+    elif data_source == "random":
+        return col.options[col.sampler.rows(seed, col.key, offset, num_records)]
+
+    elif data_source == "conditional_random":
+        groups = parent_groups(ref, col.keys)
+        return col.options[
+            col.grouped_sampler.rows(seed, col.key, offset, num_records, groups)
+        ]
+
+    elif data_source == "faker":
+        return faker_values(
+            col.faker_method,
+            num_records,
+            seed,
+            col.key,
+            offset,
+            col.pool,
+            col.locale,
+            cache_dir,
+        )
+
+    elif data_source == "increment":
+        return col.start + col.interval * np.arange(offset, offset + num_records)
+
+    elif data_source == "reference_range":
+        return lookup_reference_range(ref.astype(int), col.thresholds, col.labels)
+
+    elif data_source == "reference" and col.lookup is not None:
+        return lookup_values(ref, col.lookup)
+
+    elif data_source == "reference":
+        return lookup_reference(ref, col.keys, col.labels)
+
+    elif data_source == "reference_boolean":
+        return col.labels[np.where(ref == col.condition, 0, 1)]
+
+    elif data_source == "reference_boolean2":
+        return choose_on_condition(
+            ref.astype(int),
+            col.condition,
+            col.labels,
+            integer_rows(seed, col.key, offset, num_records, len(col.labels)),
+        )
+
+    elif data_source == "total":
+        operands = [results[dep].astype(float) for dep in col.deps]
+        if col.operation == "+":
+            return sum(operands, np.zeros(num_records))
+        elif col.operation == "*":
+            data = operands[0]
+            for operand in operands[1:]:
+                data *= operand
+            return data
+
+    elif data_source in DISTRIBUTIONS:
+        return distribution_values(col, num_records, offset, seed)
+
+    elif data_source == "foreign_key":
+        return foreign_key_values(col, num_records, offset, seed)
+
+    elif data_source == "expression":
+        columns = {f"c{dep + 1}": results[dep] for dep in col.deps}
+        return evaluate_expression(col.expression, columns, num_records)
+
+    elif data_source == "discount":
+        if col.operation == "-":
+            return ref.astype(float) * (1 - col.percent / 100)
+        elif col.operation == "+":
+            return ref.astype(float) * (1 + col.percent / 100)
+
+    return [None] * num_records
+
+
+def generate_data(config, num_records=None, offset=0, seed=None, profile=None):
+    """
+    Generate the [cX] columns for num_records rows starting at row offset.
+    Sequences (company, increment) continue from offset and random values
+    come from per-column streams of seed, so consecutive chunks line up
+    with a single full-size run. Columns that never reach the output
+    (plan.dead) are not generated and left out of the frame.
+    """
+    if num_records is None:
+        num_records = int(config["rec"]["num"])
+    seed = get_seed(config, seed)
+    with profiled_stage(profile, "parse"):
+        plan = compile_plan(config)
+    cache_dir = config["rec"].get("pool_cache")
+    total_records = int(config["rec"]["num"])
+    check_unique_pools(plan, total_records, cache_dir)
+
+    # Columns run in dependency order, each one written into its own
+    # preallocated array with the dtype chosen at plan time before anything
+    # reads it. The DataFrame is assembled once at the end without copying.
+    arrays = {}
+    correlated = {}
+    dead = set(plan.dead)
+    for col_index in plan.order:
+        if col_index in dead:
+            continue
+        col = plan.columns[col_index]
+        stage = "dependent" if col.deps else "base"
+        with profiled_stage(profile, stage), profiled_column(
+            profile, stage, col.section, col.name, num_records
+        ):
+            if col.group is not None:
+                data = group_member_values(
+                    plan.groups[col.group], col, correlated, num_records, offset, seed
+                )
+            else:
+                data = generate_column(
+                    col, arrays, num_records, offset, seed, cache_dir
+                )
+            if isinstance(data, pd.Categorical):
+                arrays[col_index] = data
+            else:
+                out = np.empty(num_records, dtype=column_storage(col, total_records))
+                decimals = 2 if col.precision is None else col.precision
+                arrays[col_index] = store_column(out, data, col.dtype, decimals)
+
+    live = [col for col in plan.columns if col.index not in dead]
+    df = pd.DataFrame(
+        {col.name: arrays[col.index] for col in live},
+        index=pd.RangeIndex(offset, offset + num_records),
+        copy=False,
+    )
+    if profile is not None:
+        profile.count_rows("base", num_records)
+        profile.count_rows("dependent", num_records)
+        for position, col in enumerate(live):
+            profile.set_dtype(col.section, df.dtypes.iloc[position])
+    return df
+
+
+def replace_values(values, finds, replaces):
+    """
+    Replace values equal to finds[i] with replaces[i] in one pass over the
+    rows. Values are compared by their string form, as written in the
+    config. Numeric columns stay numeric unless a replacement is not a number.
+    """
+    if len(replaces) == 1:
+        replaces = replaces * len(finds)
+    if len(finds) != len(replaces):
+        raise ValueError(
+            f"find has {len(finds)} values but replace has {len(replaces)}"
+        )
+    mapping = dict(zip(finds, replaces))
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Rename the categories; categories that become equal are merged
+        categories = values.cat.categories.astype(str)
+        table, merged = pd.factorize(
+            np.array([mapping.get(c, c) for c in categories], dtype=object)
+        )
+        codes = values.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, table[codes], -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=merged, validate=False),
+            index=values.index,
+            name=values.name,
+        )
+
+    # The result dtype depends only on the rule, so every chunk agrees.
+    # Compact int columns widen before giving up on numbers.
+    candidates = [values.dtype]
+    if values.dtype.kind == "i":
+        candidates.append(np.dtype("int64"))
+    dtype = "str"
+    for candidate in candidates:
+        try:
+            pd.Index(replaces, dtype=object).astype(candidate)
+        except (ValueError, TypeError, OverflowError):
+            continue
+        dtype = candidate
+        break
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    keys = uniques.astype(str)
+    hits = keys.isin(list(mapping))
+    if not hits.any():
+        return values.astype(dtype)
+
+    replaced = np.asarray(uniques, dtype=object).copy()
+    replaced[hits] = [mapping[key] for key in keys[hits]]
+    replaced = pd.Index(replaced, dtype=object).astype(dtype)
+    return pd.Series(replaced.take(codes), index=values.index, name=values.name)
+
+
+# pandas nullable dtype for what pd.api.types.infer_dtype finds in the
+# options; other kinds (Decimals, mixed values) stay Python objects
+NULLABLE_DTYPES = {
+    "empty": "string",
+    "string": "string",
+    "integer": "Int64",
+    "floating": "Float64",
+    "mixed-integer-float": "Float64",
+    "boolean": "boolean",
+}
+
+
+def nullable_array(options):
+    """
+    options as a pandas array whose dtype can hold missing values: text as
+    strings, numbers and booleans as nullable numbers and booleans, dates
+    and datetimes as datetime64
+    """
+    options = np.asarray(options, dtype=object)
+    kind = pd.api.types.infer_dtype(options, skipna=True)
+    if kind in NULLABLE_DTYPES:
+        return pd.array(options, dtype=NULLABLE_DTYPES[kind])
+    if kind in ("date", "datetime", "datetime64"):
+        return pd.to_datetime(options).array
+    return pd.array(options, dtype=object)
+
+
+def nullable_values(options, codes, null_mask=None, categorical=False):
+    """
+    Pick options[codes] for every row in a nullable dtype inferred from the
+    options, leaving the rows in null_mask missing. Only the distinct
+    options are converted; rows are gathered with a single take. With
+    categorical the codes are kept and the options become the categories.
+    """
+    codes = np.array(codes, dtype=np.intp)
+    if categorical:
+        table, categories = pd.factorize(np.asarray(options, dtype=object))
+        codes = np.where(codes >= 0, table[codes], -1)
+    if null_mask is not None:
+        codes[null_mask] = -1
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=categories, validate=False)
+    return nullable_array(options).take(codes, allow_fill=True)
+
+
+def append_rule(config, section, df, offset, seed, positions):
+    """
+    Apply one [aX] rule to df; returns the position of the column it wrote,
+    or None if the rule did nothing. positions holds the config position
+    (cols - 1) of every column of df.
+    """
+    operation = config[section]["operation"]
+    if operation == "replace":
+        target = int(config[section]["cols"]) - 1
+        if target in positions:
+            col_index = positions.index(target)
+            col_name = config[section].get("col_name", df.columns[col_index])
+            finds = config[section]["find"].split(",")
+            replaces = config[section]["replace"].split(",")
+
+            if col_name != df.columns[col_index]:
+                cols_list = df.columns.tolist()
+                cols_list[col_index] = col_name
+                df.columns = cols_list
+
+            df.isetitem(
+                col_index,
+                replace_values(df.iloc[:, col_index], finds, replaces),
+            )
+            return col_index
+
+    elif operation == "generate":
+        new_col = config[section].get("new_col", f"generated_{section}")
+        data_type = config[section].get("data", "random")
+        nullable = float(config[section].get("nullable", 0))
+
+        key = stream_key(section)
+
+        if data_type == "random":
+            options, sampler = compile_plan(config).append_choices[section]
+            codes = sampler.rows(seed, key, offset, len(df))
+
+        elif data_type == "faker":
+            options = faker_values(
+                config[section].get("faker_method", "name"),
+                len(df),
+                seed,
+                key,
+                offset,
+                int(config[section].get("pool", 0)),
+                config[section].get("locale", config["rec"].get("locale")),
+                config["rec"].get("pool_cache"),
             )
+            codes = np.arange(len(df))
 
-        elif data_source == "total":
-            op = col_def["operation"]
-            operands = [
-                column_defs[int(o[1:]) - 1]["name"] for o in col_def["operands"]
-            ]
-            if op == "+":
-                df[name] = df[operands].astype(float).sum(axis=1)
-            elif op == "*":
-                df[name] = df[operands[0]].astype(float)
-                for operand in operands[1:]:
-                    df[name] *= df[operand].astype(float)
-
-        elif data_source == "discount":
-            ref_col = column_defs[col_def["cols"] - 1]["name"]
-            operation = col_def["operation"]
-            percent = float(col_def["value"][0])
-            if operation == "-":
-                df[name] = df[ref_col].astype(float) * (1 - percent / 100)
-            elif operation == "+":
-                df[name] = df[ref_col].astype(float) * (1 + percent / 100)
-
-        # Convert dtype
-        if col_def["dtype"] == "int":
-            df[name] = df[name].fillna(0).astype(int)
-        elif col_def["dtype"] in ["float", "decimal"]:
-            df[name] = df[name].fillna(0).astype(float).round(2)
         else:
-            df[name] = df[name].fillna("").astype(str)
+            options = []
+            codes = np.full(len(df), -1)
 
-    return df
+        null_mask = None
+        if nullable > 0:
+            null_key = stream_key(f"{section}.nullable")
+            null_mask = uniform_rows(seed, null_key, offset, len(df)) < nullable
+
+        # Only random options are known up front
+        categorical = data_type == "random" and is_compact(config)
+        df[new_col] = nullable_values(options, codes, null_mask, categorical)
+        return df.columns.tolist().index(new_col)
 
+    return None
+
+
+def append_data(config, df, offset=0, seed=None, profile=None, positions=None):
+    """
+    Apply the [aX] rules to rows [offset, offset + len(df)) of the dataset.
+
+    positions is the config position of every column of df when some [cX]
+    columns were pruned by generate_data; it is extended with the columns
+    added here. Rules whose column is dropped by [reorder] are skipped.
+    """
+    seed = get_seed(config, seed)
+    plan = compile_plan(config)
+    if positions is None:
+        positions = list(range(len(df.columns)))
+    # Config position of the next generated column
+    next_position = len(plan.columns) if plan.dead else len(df.columns)
+    pruned = set(plan.pruned_appends)
 
-def append_data(config, df):
     for section in config.sections():
         if section.startswith("a"):
-            operation = config[section]["operation"]
-
-            if operation == "replace":
-                col_index = int(config[section]["cols"]) - 1
-                if col_index < len(df.columns):
-                    col_name = config[section].get("col_name", df.columns[col_index])
-                    find_val = config[section]["find"]
-                    replace_val = config[section]["replace"]
-
-                    if col_name != df.columns[col_index]:
-                        cols_list = df.columns.tolist()
-                        cols_list[col_index] = col_name
-                        df.columns = cols_list
-
-                    df.iloc[:, col_index] = df.iloc[:, col_index].replace(
-                        find_val, replace_val
-                    )
-
-            elif operation == "generate":
-                new_col = config[section].get("new_col", f"generated_{section}")
-                data_type = config[section].get("data", "random")
-                nullable = float(config[section].get("nullable", 0))
-
-                if data_type == "random":
-                    options = config[section]["options"].split(",")
-                    weights = config[section].get("weights", None)
-                    if weights:
-                        weights = [int(w) for w in weights.split(",")]
-                        data = [
-                            random.choices(options, weights=weights)[0]
-                            for _ in range(len(df))
-                        ]
-                    else:
-                        data = [random.choice(options) for _ in range(len(df))]
-
-                elif data_type == "faker":
-                    faker_method = config[section].get("faker_method", "name")
-                    if hasattr(fake, faker_method):
-                        data = [getattr(fake, faker_method)() for _ in range(len(df))]
-                    else:
-                        data = [fake.name() for _ in range(len(df))]
-
-                else:
-                    data = [None for _ in range(len(df))]
-
-                # Apply nullability
-                if nullable > 0:
-                    for i in range(len(data)):
-                        if random.random() < nullable:
-                            data[i] = None
-
-                df[new_col] = data
-
+            generate = config[section]["operation"] == "generate"
+            if section in pruned:
+                next_position += generate
+                continue
+
+            with profiled_stage(profile, "append"), profiled_column(
+                profile, "append", section, section, len(df)
+            ):
+                position = append_rule(config, section, df, offset, seed, positions)
+            if generate:
+                if position == len(positions):
+                    positions.append(next_position)
+                next_position += 1
+            if profile is not None and position is not None:
+                profile.columns[section]["name"] = df.columns[position]
+                profile.set_dtype(section, df.dtypes.iloc[position])
+
+    if profile is not None:
+        profile.count_rows("append", len(df))
     return df
 
 
-def reorder_columns(config, df):
+def reorder_columns(config, df, positions=None):
+    """
+    Select and order the columns listed in [reorder]. positions is the
+    config position of every column of df, if columns were pruned.
+    """
     if "reorder" in config:
         order = config["reorder"]["order"].split(",")
         order_indices = [int(x) - 1 for x in order]
 
-        if all(0 <= idx < len(df.columns) for idx in order_indices):
-            df = df.iloc[:, order_indices]
+        if positions is None:
+            positions = range(len(df.columns))
+        lookup = {position: idx for idx, position in enumerate(positions)}
+        if all(idx in lookup for idx in order_indices):
+            # Each column has its own block, so selecting by position keeps
+            # the generated arrays instead of copying them
+            df = df.iloc[:, [lookup[idx] for idx in order_indices]]
 
     return df
 
 
-def build_from_config_path(config_path):
+def memory_per_row(df):
     """
-    Build DataFrame from config file path
+    Bytes per row of df, including the strings of object columns, overall
+    and by column
+    """
+    rows = max(len(df), 1)
+    usage = df.memory_usage(index=False, deep=True)
+    return {
+        "bytes_per_row": round(usage.sum() / rows, 1),
+        "columns": {name: round(size / rows, 1) for name, size in usage.items()},
+    }
+
+
+def get_chunk_size(config, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = int(config["rec"].get("chunk_size", DEFAULT_CHUNK_SIZE))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    return chunk_size
+
+
+def build_chunk(config, num_records=None, offset=0, seed=None, profile=None):
+    """
+    Generate rows [offset, offset + num_records) and apply the mode steps
     """
-    config = configparser.ConfigParser()
-    config.read(config_path)
     mode = int(config["rec"].get("mode", 1))
+    seed = get_seed(config, seed)
+    plan = compile_plan(config)
 
-    df = generate_data(config)
+    df = generate_data(config, num_records, offset, seed, profile)
+    # Config positions of the columns in df, which lacks the pruned ones
+    positions = [col.index for col in plan.columns if col.index not in plan.dead]
 
     if mode >= 2:
-        df = append_data(config, df)
+        df = append_data(config, df, offset, seed, profile, positions)
     if mode == 3:
-        df = reorder_columns(config, df)
+        with profiled_stage(profile, "reorder", len(df)):
+            df = reorder_columns(config, df, positions)
 
     return df
 
 
-def build_from_config_object(config):
-    print(f"Config sections: {config.sections()}")
-    for section in config.sections():
-        print(f"[{section}]: {dict(config[section])}")
+def split_rows(num_records, chunk_size, start=0):
     """
-    Build DataFrame from config object directly
+    Return (offset, rows) pairs covering rows [start, num_records) in
+    chunk_size steps. An empty range still yields one empty chunk so
+    headers get written.
     """
-    mode = int(config["rec"].get("mode", 1))
+    return [
+        (offset, min(chunk_size, num_records - offset))
+        for offset in range(start, num_records, chunk_size)
+    ] or [(start, 0)]
 
-    df = generate_data(config)
 
-    if mode == 2:
-        df = append_data(config, df)
-    if mode == 3:
-        df = reorder_columns(config, df)
+def iter_chunks(config, chunk_size=None, seed=None, profile=None, start=0):
+    """
+    Yield the dataset as consecutive DataFrames of at most chunk_size rows.
+    Each chunk goes through the same mode steps as a full run, so memory is
+    bounded by the chunk size rather than [rec] num. With start, only rows
+    [start, num) are generated, the same rows a full run ends with.
+    """
+    num_records = int(config["rec"]["num"])
+    chunk_size = get_chunk_size(config, chunk_size)
+    seed = get_seed(config, seed)
 
-    return df
+    for offset, rows in split_rows(num_records, chunk_size, start):
+        yield build_chunk(config, rows, offset, seed, profile)
 
 
-def build_from_config_string(config_string):
+def config_to_string(config):
+    buffer = io.StringIO()
+    config.write(buffer)
+    return buffer.getvalue()
+
+
+def generate_shard(config_string, num_records, offset, seed, profile=False):
     """
-    Build DataFrame from config string
+    Worker entry point: build one shard of rows. With profile, returns the
+    shard together with its Profile.
     """
     config = configparser.ConfigParser()
     config.read_string(config_string)
 
-    return build_from_config_object(config)
+    if not profile:
+        return build_chunk(config, num_records, offset, seed)
+    shard_profile = Profile()
+    df = build_chunk(config, num_records, offset, seed, shard_profile)
+    shard_profile.close()
+    return df, shard_profile
+
+
+def iter_parallel_chunks(
+    config, workers, chunk_size=None, seed=None, profile=None, start=0
+):
+    """
+    Like iter_chunks, but shards are generated in a pool of worker processes
+    and yielded in row order. Rows come from the same seeded streams as in
+    a single process, so the output does not depend on the number of
+    workers. At most 2 * workers shards are in flight.
+    """
+    num_records = int(config["rec"]["num"])
+    chunk_size = get_chunk_size(config, chunk_size)
+    # Keep every worker busy even when the dataset fits in a single chunk
+    chunk_size = max(1, min(chunk_size, -(-(num_records - start) // workers)))
+    seed = get_seed(config, seed)
+    config_string = config_to_string(config)
+
+    def shard_result(future):
+        if profile is None:
+            return future.result()
+        # Worker times add up as CPU time; the wall time is the caller's
+        df, shard_profile = future.result()
+        profile.merge(shard_profile)
+        return df
+
+    # Faker pools are built once here rather than in every worker
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=preload_pools, initargs=(load_pools(config),)
+    ) as executor:
+        pending = deque()
+        for offset, rows in split_rows(num_records, chunk_size, start):
+            pending.append(
+                executor.submit(
+                    generate_shard,
+                    config_string,
+                    rows,
+                    offset,
+                    seed,
+                    profile is not None,
+                )
+            )
+            if len(pending) >= 2 * workers:
+                yield shard_result(pending.popleft())
+        while pending:
+            yield shard_result(pending.popleft())
+
+
+def build_dataframe(config, workers=1, seed=None, profile=None):
+    if workers > 1:
+        chunks = iter_parallel_chunks(config, workers, seed=seed, profile=profile)
+        return pd.concat(chunks)
+    return build_chunk(config, seed=seed, profile=profile)
+
+
+def build_from_config_path(config_path, workers=1, seed=None, profile=None):
+    """
+    Build DataFrame from config file path
+    """
+    config = configparser.ConfigParser()
+    with profiled_stage(profile, "parse"):
+        config.read(config_path)
+
+    return build_dataframe(config, workers, seed, profile)
+
+
+def build_from_config_object(config, workers=1, seed=None, profile=None):
+    """
+    Build DataFrame from config object directly
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Config sections: %s", config.sections())
+        for section in config.sections():
+            logger.debug("[%s]: %s", section, dict(config[section]))
+    return build_dataframe(config, workers, seed, profile)
+
+
+def build_from_config_string(config_string, workers=1, seed=None, profile=None):
+    """
+    Build DataFrame from config string
+    """
+    config = configparser.ConfigParser()
+    with profiled_stage(profile, "parse"):
+        config.read_string(config_string)
+
+    return build_from_config_object(config, workers, seed, profile)
 
 
 def create_config_from_dict(config_dict):
@@ -296,6 +1078,10 @@ def create_config_from_dict(config_dict):
         "mode": str(config_dict.get("mode", 1)),
         "cols": str(len(config_dict.get("columns", []))),
     }
+    if config_dict.get("seed") is not None:
+        config["rec"]["seed"] = str(config_dict["seed"])
+    if config_dict.get("compact"):
+        config["rec"]["compact"] = "true"
 
     # Add [cX] sections
     for idx, col in enumerate(config_dict.get("columns", [])):
@@ -304,7 +1090,9 @@ def create_config_from_dict(config_dict):
 
         # Required fields
         config[section_name]["name"] = col.get("name", f"col_{idx + 1}")
-        config[section_name]["dtype"] = col.get("dtype", "str")
+        # Without a dtype the plan picks the data source's default
+        if col.get("dtype"):
+            config[section_name]["dtype"] = col["dtype"]
         config[section_name]["data"] = col.get("data", "random")
 
         # Optional fields
@@ -342,10 +1130,22 @@ def create_config_from_dict(config_dict):
             config[section_name]["operands"] = ",".join(col["operands"])
         if col.get("faker_method"):
             config[section_name]["faker_method"] = col["faker_method"]
+        if col.get("pool"):
+            config[section_name]["pool"] = str(col["pool"])
         if col.get("start"):
             config[section_name]["start"] = str(col["start"])
         if col.get("interval"):
             config[section_name]["interval"] = str(col["interval"])
+        if col.get("expr"):
+            # configparser reads % as interpolation
+            config[section_name]["expr"] = col["expr"].replace("%", "%%")
+        if col.get("unique"):
+            config[section_name]["unique"] = "true"
+        if col.get("weight_table"):
+            config[section_name]["weight_table"] = col["weight_table"]
+        for key in ("end", "min", "max", "mean", "std", "precision"):
+            if col.get(key) is not None:
+                config[section_name][key] = str(col[key])
 
     # Add [aX] sections if present
     for idx, append_rule in enumerate(config_dict.get("append_rules", [])):
@@ -372,9 +1172,21 @@ def create_config_from_dict(config_dict):
             config[section_name]["weights"] = ",".join(map(str, append_rule["weights"]))
         if append_rule.get("faker_method"):
             config[section_name]["faker_method"] = append_rule["faker_method"]
+        if append_rule.get("pool"):
+            config[section_name]["pool"] = str(append_rule["pool"])
         if append_rule.get("nullable"):
             config[section_name]["nullable"] = str(append_rule["nullable"])
 
+    # Add [gX] sections if present
+    for idx, group in enumerate(config_dict.get("groups", [])):
+        correlation = group["correlation"]
+        if isinstance(correlation, list):
+            correlation = "; ".join(",".join(map(str, row)) for row in correlation)
+        config[f"g{idx + 1}"] = {
+            "columns": ",".join(map(str, group["columns"])),
+            "correlation": str(correlation),
+        }
+
     # Add [reorder] section if present
     if config_dict.get("reorder"):
         config["reorder"] = {"order": ",".join(map(str, config_dict["reorder"]))}
@@ -539,62 +1351,295 @@ order = 1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17
     with open("rules_optimized.ini", "w") as f:
         f.write(config_content)
 
-    print("Optimized configuration file 'rules_optimized.ini' created!")
-
-
-def main():
+    logger.info("Optimized configuration file 'rules_optimized.ini' created!")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate pseudo data from rules.ini")
+    parser.add_argument(
+        "--config", default="rules.ini", help="path to the rules file (rules.ini)"
+    )
+    parser.add_argument(
+        "--output",
+        help="output file, or directory with --partition-by "
+        "(default: output_<timestamp> with the format's extension)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        help="output format (default: [rec] format, else from --output, else csv)",
+    )
+    parser.add_argument(
+        "--compression",
+        help="codec: gzip/bz2/xz/zstd for csv, snappy/gzip/brotli/zstd/lz4 for "
+        "parquet, zstd/lz4 for feather (default: [rec] compression)",
+    )
+    parser.add_argument(
+        "--partition-by",
+        help="comma-separated columns to partition the output directory by "
+        "(default: [rec] partition_by)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help=f"rows generated per chunk (default: [rec] chunk_size or {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes generating row shards in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="seed for reproducible output (default: [rec] seed)"
+    )
+    parser.add_argument(
+        "--extend",
+        type=int,
+        metavar="ROWS",
+        help="append ROWS rows to the existing --output, continuing the run "
+        "recorded in its .state.json manifest",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="store columns in compact dtypes (categoricals, small ints); "
+        "same as [rec] compact = true",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="write a JSON timing/memory report per column and stage to PATH "
+        "('-' for stdout)",
+    )
+    parser.add_argument(
+        "--no-profile-memory",
+        dest="profile_memory",
+        action="store_false",
+        help="leave peak memory out of --profile; tracing allocations slows "
+        "down per-row sources such as faker without pool considerably",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="check the config and output options, then exit without generating",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="logging level (default: INFO)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_tables(args, config):
+    """
+    Command-line run of a multi-table config: check it with --validate, or
+    write one file per table into the --output directory
+    """
+    from fakerengine.relational import split_tables, table_order, write_tables
+
+    tables = config["tables"]
+    fmt = args.format or tables.get("format", "csv")
+    compression = normalize_compression(
+        args.compression or tables.get("compression") or DEFAULT_COMPRESSION[fmt]
+    )
+    if compression not in COMPRESSIONS[fmt]:
+        raise ValueError(f"compression '{compression}' is not supported for {fmt}")
+    if args.compact:
+        for section in config.sections():
+            if section.endswith(".rec"):
+                config[section]["compact"] = "true"
+
+    if args.validate:
+        split = split_tables(config)
+        for name in table_order(split):
+            rec = split[name]["rec"]
+            check_unique_pools(
+                compile_plan(split[name]), int(rec["num"]), rec.get("pool_cache")
+            )
+        logger.info("Config '%s' is valid: tables %s", args.config, ", ".join(split))
+        return 0
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir = args.output or f"output_{timestamp}"
+    totals = write_tables(
+        config,
+        output_dir,
+        fmt,
+        compression,
+        args.chunk_size,
+        args.workers,
+        args.seed,
+    )
+    for name, total in totals.items():
+        logger.info("Generated %d records for table '%s'", total, name)
+    logger.info("Tables saved to '%s'", output_dir)
+    return 0
+
+
+def main(argv=None):
     """Original main function for standalone execution"""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(message)s")
+    profile = Profile(memory=args.profile_memory) if args.profile else None
     try:
         config = configparser.ConfigParser()
 
         # Try to read existing config, create optimized version if not found
-        if not config.read("rules.ini"):
-            print("Configuration file 'rules.ini' not found.")
-            print("Creating optimized configuration file...")
+        if not config.read(args.config):
+            if args.validate:
+                raise FileNotFoundError(f"Configuration file '{args.config}' not found")
+            logger.warning("Configuration file '%s' not found.", args.config)
+            logger.info("Creating optimized configuration file...")
             create_optimized_sample_config()
             config.read("rules_optimized.ini")
 
-        # Get mode from config
-        mode = int(config["rec"].get("mode", 1))
-        declared_cols = int(config["rec"].get("cols", 0))
+        if config.has_section("tables"):
+            for option, value in (
+                ("--extend", args.extend),
+                ("--partition-by", args.partition_by),
+            ):
+                if value is not None:
+                    raise ValueError(f"{option} cannot be used with a [tables] config")
+            return run_tables(args, config)
 
-        # Step 1: Generate data
-        df = generate_data(config)
+        declared_cols = int(config["rec"].get("cols", 0))
+        generated_cols = len({d["name"] for d in parse_column_definitions(config)})
 
         # Validate column count
-        if declared_cols and len(df.columns) < declared_cols:
-            print(
-                f"Warning: Only {len(df.columns)} columns generated, expected {declared_cols}."
+        if declared_cols and generated_cols < declared_cols:
+            logger.warning(
+                "Warning: Only %d columns generated, expected %d.",
+                generated_cols,
+                declared_cols,
             )
 
-        # Step 2: Append data if mode >= 2
-        if mode >= 2:
-            df = append_data(config, df)
+        if args.compact:
+            config["rec"]["compact"] = "true"
 
-        # Step 3: Reorder if mode == 3
-        if mode == 3:
-            df = reorder_columns(config, df)
+        plan = compile_plan(config)
+        if plan.pruned:
+            logger.info(
+                "Skipping sections that never reach the output: %s",
+                ", ".join(plan.pruned),
+            )
+
+        rec = config["rec"]
+        fmt = args.format or rec.get("format")
+        compression = args.compression or rec.get("compression")
+        partition_by = args.partition_by or rec.get("partition_by")
+        partition_by = (
+            [c.strip() for c in partition_by.split(",")] if partition_by else []
+        )
+        if fmt is None and args.output:
+            fmt, guessed = guess_format(args.output)
+            compression = compression or guessed
+        fmt = fmt or "csv"
+        compression = normalize_compression(compression or DEFAULT_COMPRESSION[fmt])
+
+        start, seed = 0, get_seed(config, args.seed)
+        if args.extend is not None:
+            from fakerengine.state import prepare_extension
+
+            if not args.output:
+                raise ValueError("--extend needs --output, the file to extend")
+            state = prepare_extension(config, args.output, args.extend, args.seed)
+            if (args.format and args.format != state["format"]) or (
+                args.compression
+                and normalize_compression(args.compression) != state["compression"]
+            ):
+                raise ValueError(
+                    f"'{args.output}' is {state['format']} with compression "
+                    f"{state['compression']}; it can only be extended as such"
+                )
+            start, seed = state["rows"], state["seed"]
+            fmt, compression = state["format"], state["compression"]
+
+        if args.validate:
+            if compression not in COMPRESSIONS[fmt]:
+                raise ValueError(
+                    f"compression '{compression}' is not supported for {fmt}"
+                )
+            check_unique_pools(plan, int(rec["num"]), rec.get("pool_cache"))
+            logger.info(
+                "Config '%s' is valid: %d columns, %d records",
+                args.config,
+                len(plan.columns),
+                int(rec["num"]),
+            )
+            return 0
 
         # Save with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"output_{timestamp}.csv"
-        df.to_csv(output_file, index=False)
+        output_file = args.output or default_output(
+            f"output_{timestamp}", fmt, compression, partition_by
+        )
+
+        # Generate, append and reorder chunk by chunk while writing
+        first_chunk = []
+
+        def keep_first(df):
+            if not first_chunk:
+                first_chunk.append((df.head(), memory_per_row(df)))
+
+        if args.workers > 1:
+            chunks = iter_parallel_chunks(
+                config, args.workers, args.chunk_size, seed, profile, start
+            )
+        else:
+            chunks = iter_chunks(config, args.chunk_size, seed, profile, start)
+        total = write_chunks(
+            chunks,
+            output_file,
+            fmt,
+            compression,
+            partition_by,
+            on_chunk=keep_first,
+            profile=profile,
+            append=args.extend is not None,
+        )
+        if not partition_by:
+            from fakerengine.state import build_state, write_state
+
+            state = build_state(config, seed, start + total, fmt, compression)
+            write_state(output_file, state)
 
         # Logs
-        print(f"Generated {len(df)} records and saved to '{output_file}'")
-        print(f"Columns: {list(df.columns)}")
-        print(f"Data shape: {df.shape}")
-        print("\nFirst 5 rows:")
-        print(df.head())
-        print("\nData types:")
-        print(df.dtypes)
+        head, memory = first_chunk[0]
+        if args.extend is not None:
+            logger.info(
+                "Appended %d records to '%s', %d in total",
+                total,
+                output_file,
+                start + total,
+            )
+        else:
+            logger.info("Generated %d records and saved to '%s'", total, output_file)
+        logger.info("Columns: %s", list(head.columns))
+        logger.info("Data shape: %s", (total, len(head.columns)))
+        logger.info("\nFirst 5 rows:\n%s", head)
+        logger.info("\nData types:\n%s", head.dtypes)
+        logger.info("Memory: %.1f bytes/row in pandas", memory["bytes_per_row"])
+
+        if profile is not None:
+            report = json.dumps(profile.report(), indent=2)
+            if args.profile == "-":
+                print(report)
+            else:
+                with open(args.profile, "w") as f:
+                    f.write(report + "\n")
+                logger.info("Profile written to '%s'", args.profile)
 
     except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-
-        traceback.print_exc()
+        if args.validate:
+            logger.error("Invalid config: %s", e)
+        else:
+            logger.exception("Error: %s", e)
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
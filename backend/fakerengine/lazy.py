@@ -0,0 +1,33 @@
+"""
+Deferred imports for the heavy dependencies (pandas, numpy).
+
+Importing pandas takes about half a second, which dominated the start-up
+of the CLI (even for --help) and of API workers. Modules bind
+`pd = lazy_import("pandas")` instead of `import pandas as pd`; the real
+module is imported the first time one of its attributes is used.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        # Only called for attributes not found yet: import the module, then
+        # copy its namespace so later lookups are plain attribute reads
+        module = importlib.import_module(self._lazy_name)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._lazy_name}'>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,142 @@
+"""
+External lookup tables for `reference` columns.
+
+`lookup_file` points a reference column at a CSV, Parquet or Arrow/Feather
+file holding the key -> value mapping. The file is read once and turned
+into two .npy arrays in a cache directory: the keys as sorted UTF-8 bytes
+and the values in the same order. Later compiles, in this or any worker
+process, open the arrays memory-mapped, so every process shares the same
+read-only pages instead of holding its own copy. Rows are joined in bulk:
+the distinct referenced values are binary searched in the sorted keys.
+
+The cache is keyed by the file's path, size and mtime, so it is rebuilt
+when the file changes. It lives in `[rec] lookup_cache`, by default
+<tmp>/fakerdata_lookup.
+"""
+
+import hashlib
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+
+from fakerengine.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "fakerdata_lookup")
+
+
+@dataclass(frozen=True)
+class LookupTable:
+    """
+    keys: sorted UTF-8 encoded keys. values: the value of each key, plus a
+    last entry used for keys that are not found (the file's last value,
+    like inline `reference` columns).
+    """
+
+    keys: object
+    values: object
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def read_frame(path, columns=None):
+    """
+    Read a CSV, Parquet or Arrow/Feather file, chosen by its extension
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    if ext in (".feather", ".arrow", ".ipc"):
+        return pd.read_feather(path, columns=columns)
+    # Keys compare as text, so keep every field exactly as written
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+
+
+def read_table(path, key_column, value_column):
+    """
+    Read the key and value columns of a CSV, Parquet or Arrow/Feather file.
+    Without column names the first two columns are used.
+    """
+    columns = [key_column, value_column] if key_column and value_column else None
+    df = read_frame(path, columns)
+    if df.shape[1] < 2 or len(df) == 0:
+        raise ValueError(f"{path}: a lookup file needs a key and a value column")
+    return df[columns] if columns else df.iloc[:, :2]
+
+
+def encode_strings(values):
+    """
+    Values as UTF-8 bytes, converted to text the way str() does
+    """
+    return np.char.encode(np.asarray(values, dtype=str), "utf-8")
+
+
+def build_table(path, key_column, value_column, storage):
+    df = read_table(path, key_column, value_column)
+    keys = encode_strings(df.iloc[:, 0])
+    # Stable, so among duplicate keys the last one in the file comes last
+    order = np.argsort(keys, kind="stable")
+    values = df.iloc[:, 1].to_numpy()[np.append(order, len(order) - 1)]
+    if storage == "object":
+        values = encode_strings(values)
+    else:
+        values = values.astype(storage)
+    return keys[order], values
+
+
+def cache_paths(path, key_column, value_column, storage, cache_dir):
+    stat = os.stat(path)
+    ident = (
+        f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:"
+        f"{key_column}:{value_column}:{storage}"
+    )
+    stem = os.path.join(cache_dir, hashlib.sha256(ident.encode()).hexdigest()[:24])
+    return stem + ".keys.npy", stem + ".values.npy"
+
+
+def load_lookup(
+    path, key_column=None, value_column=None, storage="object", cache_dir=None
+):
+    """
+    Return the LookupTable of a lookup file, building its memory-mapped
+    arrays in cache_dir on first use
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    keys_path, values_path = cache_paths(
+        path, key_column, value_column, storage, cache_dir
+    )
+    if not (os.path.exists(keys_path) and os.path.exists(values_path)):
+        keys, values = build_table(path, key_column, value_column, storage)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a unique name and rename, so concurrent builds never
+        # expose a partial file
+        for target, array in ((values_path, values), (keys_path, keys)):
+            partial = f"{target}.{uuid.uuid4().hex}.npy"
+            np.save(partial, array)
+            os.replace(partial, target)
+    return LookupTable(
+        keys=np.load(keys_path, mmap_mode="r"),
+        values=np.load(values_path, mmap_mode="r"),
+    )
+
+
+def lookup_values(ref_vals, table):
+    """
+    Join ref_vals, compared as strings, with the table's keys. Only the
+    distinct referenced values are searched; rows are filled by their codes.
+    """
+    codes, uniques = pd.factorize(ref_vals, use_na_sentinel=False)
+    query = encode_strings(uniques)
+    positions = np.searchsorted(table.keys, query, side="right") - 1
+    found = positions >= 0
+    found[found] = table.keys[positions[found]] == query[found]
+    picks = np.where(found, positions, len(table))
+
+    values = np.asarray(table.values[picks])
+    if values.dtype.kind == "S":
+        values = np.array([v.decode() for v in values], dtype=object)
+    return values[codes]
@@ -0,0 +1,861 @@
+"""
+Compile a rules config into a typed, dependency-ordered execution plan.
+
+compile_plan parses every [cX] section once: numbers are converted, `cols`
+and `operands` are resolved to column indices, columns are topologically
+sorted so every column runs after the columns it reads, and columns that
+never reach the output are marked dead so they are not generated at all
+([aX] rules whose column is dropped by [reorder] are listed too). Plans are cached by a hash of
+the config so repeated builds of the same rules skip all of this.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import heapq
+import io
+import math
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from fakerengine.copula import ColumnGroup, cholesky_factor, parse_correlation
+from fakerengine.expression import Expression, parse_expression
+from fakerengine.lazy import lazy_import
+from fakerengine.lookup import LookupTable, load_lookup, read_frame
+from fakerengine.rng import (
+    GroupedSampler,
+    Sampler,
+    make_grouped_sampler,
+    make_sampler,
+    stream_key,
+)
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Number of compiled plans kept in memory, least recently used dropped first
+PLAN_CACHE_SIZE = 64
+# [rec] keys that only affect a run, not the plan
+RUNTIME_KEYS = {"num", "cols", "seed", "chunk_size", "pool_cache", "lookup_cache"}
+# Keys naming a file read at compile time; its size and mtime join the hash
+FILE_KEYS = {"options_file", "lookup_file", "weights_file", "keys_file", "starts_file"}
+
+# numpy storage for each dtype; anything else is stored as strings
+STORAGE_DTYPES = {
+    "int": "int64",
+    "float": "float64",
+    "float32": "float32",
+    "decimal": "float64",
+}
+
+# Sources drawn from a distribution, with the dtype used when none is given
+DISTRIBUTIONS = {
+    "uniform": "float",
+    "normal": "float",
+    "lognormal": "float",
+    "poisson": "int",
+    "date_range": "date",
+    "timestamp": "timestamp",
+}
+# Units a timestamp can be rounded to, as numpy datetime64 units
+TIME_UNITS = ("D", "h", "m", "s", "ms", "us")
+
+# Faker pool of unique faker columns without `pool`; suffixes extend it
+UNIQUE_POOL_SIZE = 10000
+
+# Signed integer types tried, smallest first, for compact int columns
+INT_STORAGE = ("int8", "int16", "int32", "int64")
+
+# String sources whose values all come from the config, stored as
+# categoricals in compact mode
+CATEGORICAL_SOURCES = {
+    "random",
+    "conditional_random",
+    "reference",
+    "reference_range",
+    "reference_boolean",
+}
+# Sources whose values are picked from `options`
+OPTION_SOURCES = {"random", "conditional_random"}
+
+# Sources that read the single column given by `cols`
+COLS_SOURCES = {
+    "reference",
+    "reference_range",
+    "reference_boolean",
+    "reference_boolean2",
+    "discount",
+}
+
+_plan_cache = OrderedDict()
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    index: int
+    section: str
+    name: str
+    dtype: str
+    storage: str
+    data: str
+    key: int
+    deps: tuple = ()
+    options: Optional[np.ndarray] = None
+    sampler: Optional[Sampler] = None
+    grouped_sampler: Optional[GroupedSampler] = None
+    keys: Optional[tuple] = None
+    labels: Optional[np.ndarray] = None
+    lookup: Optional[LookupTable] = None
+    expression: Optional[Expression] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    precision: Optional[int] = None
+    unit: Optional[str] = None
+    group: Optional[int] = None  # index into Plan.groups
+    unique: bool = False
+    parent_keys: Optional[np.ndarray] = None
+    child_starts: Optional[np.ndarray] = None
+    thresholds: Optional[tuple] = None
+    condition: Optional[int] = None
+    operation: Optional[str] = None
+    percent: Optional[float] = None
+    start: int = 1
+    interval: int = 1
+    faker_method: str = "name"
+    pool: int = 0
+    locale: Optional[str] = None
+    compact: bool = False
+    low: Optional[int] = None
+    high: Optional[int] = None
+    categories: Optional[np.ndarray] = None
+    category_codes: Optional[np.ndarray] = None
+
+
+@dataclass(frozen=True)
+class Plan:
+    columns: tuple
+    order: tuple
+    dead: tuple = ()
+    reorder: Optional[tuple] = None
+    pruned_appends: tuple = ()
+    # (options, sampler) of each [aX] generate rule with data = random
+    append_choices: dict = field(default_factory=dict)
+    # correlated [gX] column groups
+    groups: tuple = ()
+
+    @property
+    def names(self):
+        return [col.name for col in self.columns]
+
+    @property
+    def pruned(self):
+        """
+        Sections skipped because nothing they produce reaches the output
+        """
+        return [self.columns[idx].section for idx in self.dead] + list(
+            self.pruned_appends
+        )
+
+
+def parse_column_definitions(config):
+    defs = []
+    for section in config.sections():
+        if section.startswith("c"):
+            col = config[section]
+            data = col.get("data", "random")
+            col_def = {
+                "section": section,
+                "name": col.get("name", section),
+                "dtype": col.get("dtype", DISTRIBUTIONS.get(data, "str")),
+                "data": data,
+                "options": (
+                    col.get("options", "").split(",") if "options" in col else None
+                ),
+                "weights": (
+                    [int(w) for w in col.get("weights", "1").split(",")]
+                    if "weights" in col
+                    else None
+                ),
+                "options_file": col.get("options_file"),
+                "weight_table": col.get("weight_table"),
+                "weights_file": col.get("weights_file"),
+                "range": (col.get("range", "").split(",") if "range" in col else None),
+                "value": col.get("value", "").split(",") if "value" in col else None,
+                "cols": int(col.get("cols", "0")),
+                "operation": col.get("operation"),
+                "operands": (
+                    col.get("operands", "").split(",") if "operands" in col else None
+                ),
+                "faker_method": col.get("faker_method", "name"),
+                "pool": int(col.get("pool", "0")),
+                "locale": col.get("locale", config["rec"].get("locale")),
+                "condition": col.get("condition"),
+                "start": col.get("start"),
+                "interval": col.get("interval"),
+                "expr": col.get("expr"),
+                "end": col.get("end"),
+                "min": col.get("min"),
+                "max": col.get("max"),
+                "mean": col.get("mean"),
+                "std": col.get("std"),
+                "precision": col.get("precision"),
+                "unique": col.getboolean("unique", fallback=False),
+                "keys_file": col.get("keys_file"),
+                "starts_file": col.get("starts_file"),
+                "lookup_file": col.get("lookup_file"),
+                "key_column": col.get("key_column"),
+                "value_column": col.get("value_column"),
+                "lookup_cache": config["rec"].get("lookup_cache"),
+            }
+            defs.append(col_def)
+    return defs
+
+
+def config_hash(config):
+    """
+    Hash of everything in the config that affects the compiled plan
+    """
+    buffer = io.StringIO()
+    for section in config.sections():
+        buffer.write(f"[{section}]\n")
+        for key, value in config[section].items():
+            if section == "rec" and key in RUNTIME_KEYS:
+                continue
+            if key in FILE_KEYS and os.path.exists(value):
+                stat = os.stat(value)
+                value = f"{value}:{stat.st_size}:{stat.st_mtime_ns}"
+            buffer.write(f"{key}={value}\n")
+    return hashlib.sha256(buffer.getvalue().encode()).hexdigest()
+
+
+def resolve_column(col_def, position, num_columns):
+    """
+    Turn a 1-based column reference into a column index
+    """
+    index = int(position) - 1
+    if not 0 <= index < num_columns:
+        raise ValueError(
+            f"[{col_def['section']}] {col_def['name']} references column "
+            f"{position}, but only {num_columns} columns are defined"
+        )
+    return index
+
+
+def read_options_file(path):
+    """
+    Options and, if given, weights from a CSV file without header: the
+    first field of each line is an option, the optional second its weight.
+    A plain text file with one option per line also works.
+    """
+    options, weights = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            options.append(row[0])
+            if len(row) > 1 and row[1].strip():
+                weights.append(float(row[1]))
+    if weights and len(weights) != len(options):
+        raise ValueError(f"{path}: give a weight on every line or on none")
+    return options, weights or None
+
+
+def compile_choices(section, options, weights, options_file=None):
+    """
+    Options and prepared sampler of a random column or [aX] rule. With
+    options_file the options (and weights, unless given) are read from it.
+    """
+    if options_file:
+        options, file_weights = read_options_file(options_file)
+        weights = weights or file_weights
+
+    options = options or []
+    p = None
+    if weights:
+        total = sum(weights)
+        p = tuple(w / total for w in weights)
+    try:
+        sampler = make_sampler(len(options), p)
+    except ValueError as e:
+        raise ValueError(f"[{section}] {e}") from e
+    return options, sampler
+
+
+def parse_weight_table(text):
+    """
+    Parent values and their weights from `weight_table` lines (or ;
+    separated entries) such as `USA: 60,30,10`
+    """
+    parents, rows = [], []
+    for line in re.split(r"[\n;]", text):
+        if not line.strip():
+            continue
+        parent, sep, weights = line.rpartition(":")
+        if not sep:
+            raise ValueError(
+                f"weight_table entry '{line.strip()}' needs value: weights"
+            )
+        parents.append(parent.strip())
+        rows.append([float(w) for w in weights.split(",")])
+    return parents, rows
+
+
+def read_weights_file(path, options):
+    """
+    Parent values, options and weight matrix from a CSV, Parquet or
+    Arrow/Feather file with one (parent, option, weight) row per pair, in
+    its first three columns. Options a parent does not list get weight 0.
+    Without options in the section they are taken from the file, in order
+    of first appearance.
+    """
+    df = read_frame(path)
+    if df.shape[1] < 3:
+        raise ValueError(f"{path}: a weights file needs parent, option and weight")
+    parent_codes, parents = pd.factorize(df.iloc[:, 0].astype(str))
+    option_names = df.iloc[:, 1].astype(str)
+    if options is None:
+        options = list(pd.unique(option_names))
+    option_codes = pd.Index(options).get_indexer(option_names)
+    if (option_codes < 0).any():
+        unknown = option_names[option_codes < 0].iloc[0]
+        raise ValueError(f"{path}: option '{unknown}' is not in options")
+    matrix = np.zeros((len(parents), len(options)))
+    np.add.at(matrix, (parent_codes, option_codes), pd.to_numeric(df.iloc[:, 2]))
+    return list(parents), options, matrix
+
+
+def compile_conditional(section, col_def):
+    """
+    Options and grouped sampler of a conditional_random column: one weight
+    row per parent value from weight_table or weights_file, plus a last row
+    for parent values not listed (`*`, else `weights`, else equal weights)
+    """
+    options = col_def["options"]
+    try:
+        if col_def["weights_file"]:
+            parents, options, matrix = read_weights_file(
+                col_def["weights_file"], options
+            )
+            rows = list(matrix)
+        else:
+            parents, rows = parse_weight_table(col_def["weight_table"] or "")
+        if not options:
+            raise ValueError("conditional_random needs options")
+
+        default = col_def["weights"] or [1] * len(options)
+        if "*" in parents:
+            default = rows.pop(parents.index("*"))
+            parents.remove("*")
+        names = parents + ["*"]
+        for parent, row in zip(names, rows + [default]):
+            if len(row) != len(options):
+                raise ValueError(
+                    f"{len(row)} weights given for {len(options)} options "
+                    f"(parent value '{parent}')"
+                )
+        weights = np.array(rows + [default], dtype=float)
+        invalid = (weights < 0).any(axis=1) | (weights.sum(axis=1) <= 0)
+        if invalid.any():
+            raise ValueError(
+                f"weights of parent value '{names[invalid.argmax()]}' must be "
+                "non-negative and not all zero"
+            )
+        sampler = make_grouped_sampler(weights)
+    except ValueError as e:
+        raise ValueError(f"[{section}] {col_def['name']}: {e}") from e
+    return options, tuple(parents), sampler
+
+
+def typed_values(col_def, values, storage):
+    """
+    Convert option/label strings to the column's storage dtype once, so
+    generated rows are already typed
+    """
+    try:
+        return np.array(values, dtype=object).astype(storage)
+    except ValueError as e:
+        raise ValueError(
+            f"[{col_def['section']}] {col_def['name']}: values do not match "
+            f"dtype {col_def['dtype']}: {e}"
+        ) from e
+
+
+def compile_distribution(spec, col_def):
+    """
+    Parameters of a uniform, normal, lognormal, poisson, date_range or
+    timestamp column. Dates and timestamps keep their bounds as integer
+    counts of their unit, which is also their storage resolution.
+    """
+    data_source = col_def["data"]
+    where = f"[{col_def['section']}] {col_def['name']}"
+
+    def number(key, default=None):
+        value = col_def[key]
+        if value is None or value == "":
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(
+                f"{where}: {key} must be a number, got '{value}'"
+            ) from None
+
+    if data_source in ("date_range", "timestamp"):
+        unit = "D" if data_source == "date_range" else col_def["precision"] or "s"
+        if unit not in TIME_UNITS:
+            raise ValueError(
+                f"{where}: precision must be one of {', '.join(TIME_UNITS)}"
+            )
+        if not col_def["start"] or not col_def["end"]:
+            raise ValueError(f"{where}: {data_source} needs start and end")
+        try:
+            bounds = [
+                int(np.datetime64(col_def[key], unit).astype("int64"))
+                for key in ("start", "end")
+            ]
+        except ValueError as e:
+            raise ValueError(f"{where}: {e}") from e
+        spec["minimum"], spec["maximum"] = bounds
+        spec["unit"] = unit
+        # pandas keeps second, milli- and microsecond resolution
+        spec["storage"] = f"datetime64[{unit if unit in ('ms', 'us') else 's'}]"
+    else:
+        spec["minimum"] = number("min")
+        spec["maximum"] = number("max")
+        if data_source == "uniform" and None in (spec["minimum"], spec["maximum"]):
+            raise ValueError(f"{where}: uniform needs min and max")
+        spec["mean"] = number("mean", 1.0 if data_source == "poisson" else 0.0)
+        spec["std"] = number("std", 1.0)
+        if spec["std"] < 0 or (data_source == "poisson" and spec["mean"] < 0):
+            raise ValueError(f"{where}: std and a poisson mean cannot be negative")
+        precision = number("precision")
+        if precision is not None:
+            if precision < 0 or precision != int(precision):
+                raise ValueError(f"{where}: precision must be a whole number")
+            spec["precision"] = int(precision)
+
+    if None not in (spec["minimum"], spec["maximum"]) and (
+        spec["minimum"] > spec["maximum"]
+    ):
+        raise ValueError(f"{where}: min is larger than max")
+
+
+def compile_lookup(col_def, storage):
+    """
+    Load the lookup_file of a reference column, values in its storage dtype
+    """
+    try:
+        return load_lookup(
+            col_def["lookup_file"],
+            col_def["key_column"],
+            col_def["value_column"],
+            storage,
+            col_def["lookup_cache"],
+        )
+    except (OSError, ValueError, KeyError) as e:
+        raise ValueError(
+            f"[{col_def['section']}] {col_def['name']}: cannot use lookup_file "
+            f"{col_def['lookup_file']}: {e}"
+        ) from e
+
+
+def is_compact(config):
+    return config["rec"].getboolean("compact", fallback=False)
+
+
+def add_compact_storage(spec):
+    """
+    Record what compact storage needs: the declared value range of int
+    columns, and the distinct values plus a code for each option/label of
+    string columns, which are then stored as categoricals.
+    """
+    spec["compact"] = True
+    values = (
+        spec.get("options") if spec["data"] in OPTION_SOURCES else spec.get("labels")
+    )
+    if spec.get("lookup") is not None:
+        values = spec["lookup"].values
+
+    if spec["storage"] == "int64" and None not in (
+        spec.get("minimum"),
+        spec.get("maximum"),
+    ):
+        spec["low"] = math.floor(spec["minimum"])
+        spec["high"] = math.ceil(spec["maximum"])
+
+    elif spec["storage"] == "int64" and values is not None and len(values):
+        spec["low"] = int(values.min())
+        spec["high"] = int(values.max())
+        if spec["data"] == "reference_boolean2":
+            spec["low"] = min(spec["low"], 0)
+            spec["high"] = max(spec["high"], 0)
+
+    elif (
+        spec["storage"] == "object"
+        and spec["data"] in CATEGORICAL_SOURCES
+        and spec.get("lookup") is None
+        and not spec.get("unique")
+    ):
+        codes, categories = pd.factorize(np.asarray(values, dtype=object))
+        spec["categories"] = np.asarray(categories, dtype=object)
+        spec["category_codes"] = codes.astype(np.intp)
+
+
+def column_storage(col, total_records):
+    """
+    numpy dtype of the column when the whole dataset has total_records rows.
+    Compact int columns get the smallest type holding their range; company
+    and increment ranges depend on the row count.
+    """
+    if not col.compact or col.storage != "int64":
+        return col.storage
+
+    low, high = col.low, col.high
+    last = max(total_records - 1, 0)
+    if col.data == "company":
+        low, high = 1, last + 1
+    elif col.data == "increment":
+        low, high = sorted((col.start, col.start + col.interval * last))
+    if low is None:
+        return col.storage
+
+    for storage in INT_STORAGE:
+        info = np.iinfo(storage)
+        if info.min <= low and high <= info.max:
+            return storage
+    return col.storage
+
+
+def compile_column(index, col_def, num_columns, compact=False):
+    section = col_def["section"]
+    data_source = col_def["data"]
+    storage = STORAGE_DTYPES.get(col_def["dtype"], "object")
+    spec = {
+        "index": index,
+        "section": section,
+        "name": col_def["name"],
+        "dtype": col_def["dtype"],
+        "storage": storage,
+        "data": data_source,
+        "key": stream_key(section),
+    }
+
+    if col_def["unique"]:
+        if data_source not in ("random", "faker"):
+            raise ValueError(
+                f"[{section}] {col_def['name']}: unique is only supported for "
+                "random and faker columns"
+            )
+        spec["unique"] = True
+
+    if data_source == "random":
+        options, spec["sampler"] = compile_choices(
+            section, col_def["options"], col_def["weights"], col_def["options_file"]
+        )
+        spec["options"] = typed_values(col_def, options, storage)
+        if col_def["unique"]:
+            # Options equal once typed count once
+            spec["options"] = pd.unique(spec["options"])
+
+    elif data_source == "conditional_random":
+        spec["deps"] = (resolve_column(col_def, col_def["cols"], num_columns),)
+        options, spec["keys"], spec["grouped_sampler"] = compile_conditional(
+            section, col_def
+        )
+        spec["options"] = typed_values(col_def, options, storage)
+
+    elif data_source == "foreign_key":
+        # Files written by fakerengine.relational when the parent table is
+        # generated; without them the column cannot be filled
+        if col_def["keys_file"]:
+            spec["parent_keys"] = np.load(col_def["keys_file"], mmap_mode="r")
+        if col_def["starts_file"]:
+            spec["child_starts"] = np.load(col_def["starts_file"], mmap_mode="r")
+
+    elif data_source == "faker":
+        spec["faker_method"] = col_def["faker_method"]
+        spec["pool"] = col_def["pool"]
+        spec["locale"] = col_def["locale"]
+
+    elif data_source == "increment":
+        spec["start"] = int(col_def["start"]) if col_def["start"] else 1
+        spec["interval"] = int(col_def["interval"]) if col_def["interval"] else 1
+
+    elif data_source in COLS_SOURCES:
+        spec["deps"] = (resolve_column(col_def, col_def["cols"], num_columns),)
+        values = col_def["value"] or []
+
+        if data_source == "reference_range":
+            spec["thresholds"] = tuple(int(r) for r in col_def["range"] or [])
+            spec["labels"] = typed_values(col_def, values, storage)
+
+        elif data_source == "reference" and col_def["lookup_file"]:
+            spec["lookup"] = compile_lookup(col_def, storage)
+
+        elif data_source == "reference":
+            spec["keys"] = tuple(values)
+            spec["labels"] = typed_values(col_def, col_def["range"] or [], storage)
+
+        elif data_source == "reference_boolean":
+            if len(values) != 2:
+                raise ValueError(
+                    f"[{section}] reference_boolean needs exactly two values"
+                )
+            spec["labels"] = typed_values(col_def, values, storage)
+            spec["condition"] = int(col_def["condition"])
+
+        elif data_source == "reference_boolean2":
+            spec["labels"] = typed_values(col_def, values, storage)
+            spec["condition"] = int(col_def["condition"])
+
+        elif data_source == "discount":
+            spec["operation"] = col_def["operation"]
+            spec["percent"] = float(values[0])
+
+    elif data_source in DISTRIBUTIONS:
+        compile_distribution(spec, col_def)
+
+    elif data_source == "expression":
+        try:
+            expression = parse_expression(col_def["expr"] or "")
+        except ValueError as e:
+            raise ValueError(f"[{section}] {col_def['name']}: {e}") from e
+        spec["expression"] = expression
+        spec["deps"] = tuple(
+            resolve_column(col_def, number, num_columns)
+            for number in expression.columns
+        )
+
+    elif data_source == "total":
+        spec["operation"] = col_def["operation"]
+        spec["deps"] = tuple(
+            resolve_column(col_def, operand.strip()[1:], num_columns)
+            for operand in col_def["operands"] or []
+        )
+
+    if compact:
+        add_compact_storage(spec)
+    return ColumnPlan(**spec)
+
+
+def topological_order(columns):
+    """
+    Order column indices so that dependencies come first, keeping section
+    order wherever the dependencies allow it. Raises ValueError on cycles.
+    """
+    dependents = {col.index: [] for col in columns}
+    pending = {col.index: len(set(col.deps)) for col in columns}
+    for col in columns:
+        for dep in set(col.deps):
+            dependents[dep].append(col.index)
+
+    ready = [index for index, count in pending.items() if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        index = heapq.heappop(ready)
+        order.append(index)
+        for dependent in dependents[index]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(order) < len(columns):
+        cycle = [columns[i].name for i, count in pending.items() if count > 0]
+        raise ValueError(f"Circular column dependencies between: {', '.join(cycle)}")
+    return tuple(order)
+
+
+def output_layout(config, num_columns):
+    """
+    0-based positions selected by [reorder] in mode 3, counting the [cX]
+    columns first and then the columns added by [aX] generate rules. None
+    when every column is output.
+    """
+    mode = int(config["rec"].get("mode", 1))
+    if mode != 3 or "reorder" not in config:
+        return None
+
+    num_appended = sum(
+        1
+        for section in config.sections()
+        if section.startswith("a") and config[section].get("operation") == "generate"
+    )
+    order = tuple(int(x) - 1 for x in config["reorder"]["order"].split(","))
+    if not all(0 <= idx < num_columns + num_appended for idx in order):
+        # reorder_columns ignores invalid orders and keeps every column
+        return None
+    return order
+
+
+def output_columns(config, num_columns):
+    """
+    Indices of the [cX] columns that end up in the output
+    """
+    order = output_layout(config, num_columns)
+    if order is None:
+        return set(range(num_columns))
+    return {idx for idx in order if idx < num_columns}
+
+
+def find_pruned_appends(config, num_columns, layout):
+    """
+    [aX] rules whose column is dropped by the reorder: generate rules whose
+    new column is not selected and replace rules on an unselected column
+    """
+    if layout is None:
+        return ()
+    selected = set(layout)
+    pruned = []
+    position = num_columns
+    for section in config.sections():
+        if not section.startswith("a"):
+            continue
+        operation = config[section].get("operation")
+        if operation == "generate":
+            if position not in selected:
+                pruned.append(section)
+            position += 1
+        elif operation == "replace":
+            if int(config[section]["cols"]) - 1 not in selected:
+                pruned.append(section)
+    return tuple(pruned)
+
+
+def compile_append_choices(config):
+    choices = {}
+    for section in config.sections():
+        rule = config[section]
+        if (
+            section.startswith("a")
+            and rule.get("operation") == "generate"
+            and rule.get("data", "random") == "random"
+        ):
+            choices[section] = compile_choices(
+                section,
+                rule["options"].split(",") if "options" in rule else None,
+                (
+                    [int(w) for w in rule["weights"].split(",")]
+                    if rule.get("weights")
+                    else None
+                ),
+                rule.get("options_file"),
+            )
+    return choices
+
+
+def compile_groups(config, columns):
+    """
+    Compile the [gX] sections into ColumnGroups and mark their member
+    columns. Members must be distribution columns, each in one group only.
+    """
+    groups = []
+    columns = list(columns)
+    for section in config.sections():
+        if not section.startswith("g"):
+            continue
+        group = config[section]
+        where = {"section": section, "name": "group"}
+        members = tuple(
+            resolve_column(where, position.strip(), len(columns))
+            for position in group.get("columns", "").split(",")
+            if position.strip()
+        )
+        try:
+            if len(set(members)) < 2 or len(set(members)) != len(members):
+                raise ValueError("list at least two different columns")
+            for index in members:
+                col = columns[index]
+                if col.data not in DISTRIBUTIONS:
+                    raise ValueError(
+                        f"{col.section} is {col.data}; members must use one of "
+                        f"{', '.join(DISTRIBUTIONS)}"
+                    )
+                if col.group is not None:
+                    raise ValueError(f"{col.section} is already in another group")
+                columns[index] = replace(col, group=len(groups))
+            matrix = parse_correlation(group.get("correlation", ""), len(members))
+            factor = cholesky_factor(matrix)
+        except ValueError as e:
+            raise ValueError(f"[{section}] {e}") from e
+        groups.append(ColumnGroup(section, stream_key(section), members, factor))
+    return tuple(columns), tuple(groups)
+
+
+def check_unique(plan, total_records):
+    """
+    Fail before generating anything when a unique column has fewer distinct
+    options, or a smaller faker pool, than rows and cannot be extended with
+    suffixes (only string columns can)
+    """
+    for col in plan.columns:
+        if not col.unique or col.storage == "object" or col.index in plan.dead:
+            continue
+        if col.options is not None:
+            size, what = len(col.options), "distinct options"
+        else:
+            size, what = col.pool or UNIQUE_POOL_SIZE, "values in its faker pool"
+        if total_records > size:
+            raise ValueError(
+                f"[{col.section}] {col.name}: unique needs [rec] num = "
+                f"{total_records} values but there are only {size} {what}"
+            )
+
+
+def find_dead_columns(columns, live):
+    """
+    Columns that are neither output nor needed to compute an output column
+    """
+    stack = list(live)
+    needed = set()
+    while stack:
+        index = stack.pop()
+        if index not in needed:
+            needed.add(index)
+            stack.extend(columns[index].deps)
+    return tuple(col.index for col in columns if col.index not in needed)
+
+
+def build_plan(config):
+    defs = parse_column_definitions(config)
+    compact = is_compact(config)
+    columns = tuple(
+        compile_column(index, col_def, len(defs), compact)
+        for index, col_def in enumerate(defs)
+    )
+    columns, groups = compile_groups(config, columns)
+    layout = output_layout(config, len(columns))
+    return Plan(
+        columns=columns,
+        order=topological_order(columns),
+        dead=find_dead_columns(columns, output_columns(config, len(columns))),
+        reorder=layout,
+        pruned_appends=find_pruned_appends(config, len(columns), layout),
+        append_choices=compile_append_choices(config),
+        groups=groups,
+    )
+
+
+def compile_plan(config):
+    """
+    Return the compiled plan for config, reusing a cached one if the rules
+    have not changed
+    """
+    key = config_hash(config)
+    if key in _plan_cache:
+        _plan_cache.move_to_end(key)
+        plan = _plan_cache[key]
+    else:
+        plan = build_plan(config)
+        _plan_cache[key] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    # The row count is not part of the plan, so check it on every use
+    check_unique(plan, int(config["rec"].get("num", 0)))
+    return plan
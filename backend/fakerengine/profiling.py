@@ -0,0 +1,172 @@
+"""
+Opt-in timing and memory instrumentation for a generation run.
+
+Pass a Profile as `profile=` to build_from_config_object (or iter_chunks,
+write_chunks, ...) and call report() afterwards. Every [cX] column, [aX]
+rule and stage (parse, base, dependent, append, reorder, write) gets its
+wall time, rows/sec and peak allocated bytes; columns also get their
+output dtype. Chunks add up, so a chunked run reports totals for the
+whole dataset. Peak bytes come from tracemalloc, which slows generation
+down while a Profile is open; pass memory=False to only record times.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+STAGES = ("parse", "base", "dependent", "append", "reorder", "write")
+
+
+def new_entry(**fields):
+    return dict(fields, seconds=0.0, rows=0, peak_bytes=0)
+
+
+class Profile:
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = {}
+        self.columns = {}
+        self.frames = []
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.owns_tracing = memory and not tracemalloc.is_tracing()
+        if self.owns_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def measure(self, entry, rows):
+        """
+        Add the time and peak memory of the with-block to entry. Blocks may
+        be nested; an outer block's peak includes its inner blocks.
+        """
+        frame = {"start": 0, "peak": 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.frames:
+                self.frames[-1]["peak"] = max(self.frames[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start"] = current
+        self.frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += time.perf_counter() - start
+            entry["rows"] += rows
+            self.frames.pop()
+            if self.memory:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                used = peak - frame["start"]
+                entry["peak_bytes"] = max(entry["peak_bytes"], used)
+                if self.frames:
+                    self.frames[-1]["peak"] = max(self.frames[-1]["peak"], peak)
+                tracemalloc.reset_peak()
+
+    def stage(self, name, rows=0):
+        if name not in self.stages:
+            self.stages[name] = new_entry(stage=name)
+        return self.measure(self.stages[name], rows)
+
+    def column(self, stage, section, name, rows=0):
+        """
+        Measure one [cX] column or [aX] rule belonging to stage
+        """
+        if section not in self.columns:
+            self.columns[section] = new_entry(
+                section=section, name=name, stage=stage, dtype=None
+            )
+        return self.measure(self.columns[section], rows)
+
+    def count_rows(self, name, rows):
+        """
+        Add rows to a stage whose time was measured in several pieces
+        """
+        if name in self.stages:
+            self.stages[name]["rows"] += rows
+
+    def set_dtype(self, section, dtype):
+        if section in self.columns:
+            self.columns[section]["dtype"] = str(dtype)
+
+    def merge(self, other):
+        """
+        Add the entries of a profile recorded elsewhere (e.g. a worker)
+        """
+        for target, source in (
+            (self.stages, other.stages),
+            (self.columns, other.columns),
+        ):
+            for key, entry in source.items():
+                if key not in target:
+                    target[key] = dict(entry)
+                    continue
+                target[key]["seconds"] += entry["seconds"]
+                target[key]["rows"] += entry["rows"]
+                target[key]["peak_bytes"] = max(
+                    target[key]["peak_bytes"], entry["peak_bytes"]
+                )
+                if entry.get("dtype") is not None:
+                    target[key]["dtype"] = entry["dtype"]
+
+    def close(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+        if self.owns_tracing:
+            tracemalloc.stop()
+            self.owns_tracing = False
+
+    def __getstate__(self):
+        # Sent back from worker processes: only the recorded entries
+        state = dict(self.__dict__)
+        state["frames"] = []
+        state["owns_tracing"] = False
+        return state
+
+    def report(self):
+        """
+        The recorded entries as a JSON-serialisable dict. Stages come in
+        pipeline order, columns slowest first.
+        """
+        self.close()
+
+        def finish(entry):
+            entry = dict(entry)
+            seconds = entry["seconds"]
+            entry["seconds"] = round(seconds, 6)
+            entry["rows_per_second"] = (
+                round(entry["rows"] / seconds, 1)
+                if seconds > 0 and entry["rows"]
+                else None
+            )
+            if not self.memory:
+                entry["peak_bytes"] = None
+            return entry
+
+        stages = sorted(
+            self.stages.values(),
+            key=lambda entry: (
+                STAGES.index(entry["stage"])
+                if entry["stage"] in STAGES
+                else len(STAGES)
+            ),
+        )
+        columns = sorted(
+            self.columns.values(), key=lambda entry: entry["seconds"], reverse=True
+        )
+        return {
+            "seconds": round(self.seconds, 6),
+            "stages": [finish(entry) for entry in stages],
+            "columns": [finish(entry) for entry in columns],
+        }
+
+
+def profiled_stage(profile, name, rows=0):
+    if profile is None:
+        return nullcontext()
+    return profile.stage(name, rows)
+
+
+def profiled_column(profile, stage, section, name, rows=0):
+    if profile is None:
+        return nullcontext()
+    return profile.column(stage, section, name, rows)
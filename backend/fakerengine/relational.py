@@ -0,0 +1,283 @@
+"""
+Multi-table generation: parent and child tables whose keys line up.
+
+A config with a [tables] section describes several named tables. Their
+sections are prefixed with the table name (`[companies.rec]`,
+`[companies.c1]`, `[leads.c1]`, ...) and each table is an ordinary rules
+config once the prefix is removed. A child table points at a parent
+column with a `foreign_key` column:
+
+    [leads.c2]
+    name = Company_ID
+    data = foreign_key
+    table = companies
+    column = Company_ID
+    children = 1-5
+
+Tables are generated parents first, chunk by chunk. While a parent table
+is streamed out, the columns its children reference are collected and
+saved as .npy files; child columns open them memory-mapped (`keys_file`),
+so worker processes share them. `children` draws a number of children for
+every parent row; their running total (`starts_file`) gives the child row
+count and, per child row, its parent by binary search. Without `children`
+each child row picks a uniformly random parent.
+"""
+
+import configparser
+import os
+import tempfile
+
+from fakerengine.fakerdata import iter_chunks, iter_parallel_chunks
+from fakerengine.lazy import lazy_import
+from fakerengine.rng import make_sampler, new_seed, stream_key
+from fakerengine.writers import default_output, write_chunks
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# dtype given to a foreign_key column without one, by the parent key's kind
+KEY_DTYPES = {"i": "int", "u": "int", "f": "float"}
+
+
+def is_multi_table(config):
+    return config.has_section("tables")
+
+
+def table_names(config):
+    return [
+        name.strip()
+        for name in config["tables"].get("names", "").split(",")
+        if name.strip()
+    ]
+
+
+def split_tables(config):
+    """
+    One config per table, in [tables] names order, from the sections named
+    <table>.<section>
+    """
+    names = table_names(config)
+    if not names:
+        raise ValueError("[tables] names must list at least one table")
+    tables = {name: configparser.ConfigParser() for name in names}
+    for section in config.sections():
+        name, sep, rest = section.partition(".")
+        if not sep:
+            continue
+        if name not in tables:
+            raise ValueError(f"[{section}] belongs to table '{name}', not in names")
+        tables[name][rest] = dict(config.items(section, raw=True))
+    for name, table in tables.items():
+        if "rec" not in table:
+            raise ValueError(f"table '{name}' needs a [{name}.rec] section")
+    return tables
+
+
+def foreign_keys(table):
+    """
+    (section, parent table, parent column) of each foreign_key column
+    """
+    return [
+        (section, table[section].get("table"), table[section].get("column"))
+        for section in table.sections()
+        if section.startswith("c") and table[section].get("data") == "foreign_key"
+    ]
+
+
+def table_order(tables):
+    """
+    Table names ordered so every parent comes before its children
+    """
+    order, visiting = [], set()
+
+    def visit(name, child=None):
+        if name not in tables:
+            raise ValueError(f"table '{child}' references unknown table '{name}'")
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"tables reference each other in a cycle via '{name}'")
+        visiting.add(name)
+        for section, parent, column in foreign_keys(tables[name]):
+            if not parent or not column:
+                raise ValueError(
+                    f"[{name}.{section}] foreign_key needs table and column"
+                )
+            visit(parent, name)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in tables:
+        visit(name)
+    return order
+
+
+def table_seed(seed, name):
+    """
+    Seed of a table without its own [rec] seed, derived from the run seed
+    so tables with the same section names still draw different values
+    """
+    state = np.random.SeedSequence([seed, stream_key(name)]).generate_state(1)
+    return int(state[0])
+
+
+def parse_children(section, text):
+    """
+    (low, high) number of children per parent from `children = 1-5` or
+    `children = 3`
+    """
+    low, sep, high = text.partition("-")
+    try:
+        low, high = int(low), int(high) if sep else int(low)
+    except ValueError:
+        raise ValueError(
+            f"[{section}] children must look like 1-5 or 3, got '{text}'"
+        ) from None
+    if not 0 <= low <= high:
+        raise ValueError(f"[{section}] children must satisfy 0 <= low <= high")
+    return low, high
+
+
+def child_starts(section, col, num_parents, seed):
+    """
+    Row where the children of each parent start, plus the total at the
+    end. Counts are drawn per parent row, weighted by children_weights.
+    """
+    low, high = parse_children(section, col["children"])
+    weights = col.get("children_weights")
+    p = None
+    if weights:
+        weights = [float(w) for w in weights.split(",")]
+        p = [w / sum(weights) for w in weights]
+    try:
+        sampler = make_sampler(high - low + 1, p)
+    except ValueError as e:
+        raise ValueError(f"[{section}] children_weights: {e}") from e
+    counts = low + sampler.rows(seed, stream_key(f"{section}:children"), 0, num_parents)
+    return np.concatenate(([0], np.cumsum(counts)))
+
+
+def link_children(name, table, keys, key_dir, seed):
+    """
+    Point the foreign_key columns of a child table at the saved parent
+    keys, and set its row count from `children` if given
+    """
+    linked = None
+    for section, parent, column in foreign_keys(table):
+        col = table[section]
+        path = keys[(parent, column)]
+        col["keys_file"] = path
+        if "dtype" not in col:
+            kind = np.load(path, mmap_mode="r").dtype.kind
+            col["dtype"] = KEY_DTYPES.get(kind, "str")
+        if col.get("children"):
+            if linked:
+                raise ValueError(
+                    f"table '{name}': only one foreign_key can set children "
+                    f"({linked} and {section} do)"
+                )
+            linked = section
+            num_parents = len(np.load(path, mmap_mode="r"))
+            starts = child_starts(f"{name}.{section}", col, num_parents, seed)
+            starts_path = os.path.join(key_dir, f"{name}.{section}.starts.npy")
+            np.save(starts_path, starts)
+            col["starts_file"] = starts_path
+            table["rec"]["num"] = str(int(starts[-1]))
+
+
+def collect_keys(name, chunks, columns, parts):
+    """
+    Pass chunks through, keeping the values of the referenced columns
+    """
+    for df in chunks:
+        for column in columns:
+            if column not in df.columns:
+                raise ValueError(f"table '{name}' has no output column '{column}'")
+            values = df[column]
+            if values.dtype.kind not in "iuf":
+                values = values.astype(str)
+            parts[column].append(values.to_numpy())
+        yield df
+
+
+def save_keys(name, parts, key_dir):
+    """
+    Save the collected key columns of a table as .npy files; string keys
+    become fixed-width unicode so they can be memory-mapped
+    """
+    paths = {}
+    for column, arrays in parts.items():
+        values = np.concatenate(arrays) if arrays else np.array([], dtype=str)
+        if values.dtype == object:
+            values = values.astype(str)
+        path = os.path.join(key_dir, f"{name}.{column}.keys.npy")
+        np.save(path, values)
+        paths[(name, column)] = path
+    return paths
+
+
+def iter_tables(config, key_dir, chunk_size=None, workers=1, seed=None):
+    """
+    Yield (name, chunks) for every table, parents first. Each table's
+    chunks must be consumed before the next table is requested, since the
+    children are linked to the keys collected from them. key_dir holds the
+    saved key arrays and must outlive the iteration.
+    """
+    tables = split_tables(config)
+    if seed is None:
+        seed = config["tables"].get("seed")
+    seed = new_seed() if seed is None else int(seed)
+
+    referenced = {}
+    for table in tables.values():
+        for _, parent, column in foreign_keys(table):
+            referenced.setdefault(parent, []).append(column)
+
+    keys = {}
+    for name in table_order(tables):
+        table = tables[name]
+        rec = table["rec"]
+        seed_of_table = int(rec["seed"]) if "seed" in rec else table_seed(seed, name)
+        link_children(name, table, keys, key_dir, seed_of_table)
+
+        if workers > 1:
+            chunks = iter_parallel_chunks(table, workers, chunk_size, seed_of_table)
+        else:
+            chunks = iter_chunks(table, chunk_size, seed_of_table)
+        columns = list(dict.fromkeys(referenced.get(name, [])))
+        parts = {column: [] for column in columns}
+        yield name, collect_keys(name, chunks, columns, parts)
+        keys.update(save_keys(name, parts, key_dir))
+
+
+def build_tables(config, chunk_size=None, workers=1, seed=None):
+    """
+    Generate every table of a multi-table config into a DataFrame
+    """
+    with tempfile.TemporaryDirectory(prefix="fakerdata_keys_") as key_dir:
+        return {
+            name: pd.concat(list(chunks), ignore_index=True)
+            for name, chunks in iter_tables(config, key_dir, chunk_size, workers, seed)
+        }
+
+
+def write_tables(
+    config,
+    output_dir,
+    fmt="csv",
+    compression=None,
+    chunk_size=None,
+    workers=1,
+    seed=None,
+):
+    """
+    Stream every table of a multi-table config to <output_dir>/<table>.<ext>
+    through the chunked writers; returns the rows written per table
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    totals = {}
+    with tempfile.TemporaryDirectory(prefix="fakerdata_keys_") as key_dir:
+        for name, chunks in iter_tables(config, key_dir, chunk_size, workers, seed):
+            path = os.path.join(output_dir, default_output(name, fmt, compression))
+            totals[name] = write_chunks(chunks, path, fmt, compression)
+    return totals
@@ -0,0 +1,206 @@
+"""
+Counter-based random streams addressable by (seed, stream, row).
+
+Rows are grouped in fixed blocks of BLOCK_SIZE. Every block of every stream
+gets its own Philox generator keyed by SeedSequence([seed, stream, block]),
+so the values for row i never depend on how many rows were generated before
+it, how the rows were chunked or which process generated them.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from fakerengine.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+BLOCK_SIZE = 4096
+# Rounds of the Feistel network behind permuted_rows
+FEISTEL_ROUNDS = 4
+
+
+def new_seed():
+    """
+    Return a fresh random seed for runs that do not set one
+    """
+    return int(np.random.SeedSequence().entropy)
+
+
+def stream_key(name):
+    """
+    Stable integer key for a named stream, e.g. a config section
+    """
+    return zlib.crc32(str(name).encode())
+
+
+def block_generator(seed, key, block):
+    return np.random.Generator(
+        np.random.Philox(np.random.SeedSequence([seed, key, block]))
+    )
+
+
+def draw_rows(seed, key, offset, num_records, draw):
+    """
+    Return the values for rows [offset, offset + num_records) of a stream.
+    draw(rng, size) must return an array of size values (rows along the
+    first axis); it is called with size=BLOCK_SIZE for each block touched.
+    """
+    first = offset // BLOCK_SIZE
+    last = (offset + max(num_records, 1) - 1) // BLOCK_SIZE
+    parts = [
+        draw(block_generator(seed, key, block), BLOCK_SIZE)
+        for block in range(first, last + 1)
+    ]
+    start = offset - first * BLOCK_SIZE
+    return np.concatenate(parts)[start : start + num_records]
+
+
+def uniform_rows(seed, key, offset, num_records):
+    return draw_rows(seed, key, offset, num_records, lambda rng, size: rng.random(size))
+
+
+def integer_rows(seed, key, offset, num_records, high):
+    return draw_rows(
+        seed, key, offset, num_records, lambda rng, size: rng.integers(high, size=size)
+    )
+
+
+def mix64(values):
+    """
+    MurmurHash3 finalizer: scramble uint64 values (wrapping arithmetic)
+    """
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xFF51AFD7ED558CCD)
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xC4CEB9FE1A85EC53)
+    return values ^ (values >> np.uint64(33))
+
+
+def feistel(values, round_keys, half_bits):
+    """
+    Bijection of [0, 4 ** half_bits): a balanced Feistel network over the
+    two half_bits halves of each value
+    """
+    mask = np.uint64((1 << half_bits) - 1)
+    shift = np.uint64(half_bits)
+    left, right = values >> shift, values & mask
+    for round_key in round_keys:
+        left, right = right, left ^ (mix64(right ^ round_key) & mask)
+    return (left << shift) | right
+
+
+def permuted_rows(seed, key, offset, num_records, size):
+    """
+    Positions in seeded permutations of range(size) for rows
+    [offset, offset + num_records): rows [0, size) are one permutation,
+    rows [size, 2 * size) another, and so on. Computed per row, so distinct
+    rows of a block get distinct positions in any chunk or process without
+    holding the permutation, and a row's position does not depend on how
+    many rows there are. Rows the network maps outside the range are mapped
+    again until they land inside (cycle walking).
+    """
+    rows = np.arange(offset, offset + num_records, dtype=np.uint64)
+    blocks = rows // np.uint64(size)
+    half_bits = max(1, (int(size - 1).bit_length() + 1) // 2)
+    # One set of round keys per block, so every block is shuffled differently
+    round_keys = np.stack(
+        [
+            mix64(blocks ^ round_key)
+            for round_key in np.random.SeedSequence([seed, key]).generate_state(
+                FEISTEL_ROUNDS, np.uint64
+            )
+        ]
+    )
+    positions = feistel(rows % np.uint64(size), round_keys, half_bits)
+    outside = np.flatnonzero(positions >= size)
+    while len(outside):
+        positions[outside] = feistel(
+            positions[outside], round_keys[:, outside], half_bits
+        )
+        outside = outside[positions[outside] >= size]
+    return positions.astype(np.int64)
+
+
+@dataclass(frozen=True)
+class Sampler:
+    """
+    Weighted choice of option positions, prepared once when the plan is
+    compiled. cdf holds the normalised cumulative weights, or is None when
+    every option is equally likely. Draws match rng.choice(size, p=p) on
+    the same stream, without renormalising p for every block.
+    """
+
+    size: int
+    cdf: Optional[np.ndarray] = None
+
+    def rows(self, seed, key, offset, num_records):
+        """
+        Option positions for rows [offset, offset + num_records)
+        """
+        if self.cdf is None:
+            return integer_rows(seed, key, offset, num_records, self.size)
+        uniform = uniform_rows(seed, key, offset, num_records)
+        return self.cdf.searchsorted(uniform, side="right")
+
+
+def make_sampler(size, p=None):
+    """
+    Sampler over size options with probabilities p (None = equal weights)
+    """
+    if size == 0:
+        raise ValueError("no options to choose from")
+    if p is None:
+        return Sampler(size)
+    p = np.asarray(p, dtype=float)
+    if len(p) != size:
+        raise ValueError(f"{len(p)} weights given for {size} options")
+    if (p < 0).any() or p.sum() <= 0:
+        raise ValueError("weights must be non-negative and not all zero")
+    cdf = p.cumsum()
+    cdf /= cdf[-1]
+    return Sampler(size, cdf)
+
+
+@dataclass(frozen=True)
+class GroupedSampler:
+    """
+    Weighted choice of option positions with a separate weight row per
+    group (e.g. per parent value). The cumulative weights of group g are
+    stored shifted by g in one flat array, so a single searchsorted of
+    group + uniform draws every row, whatever group it belongs to. last
+    holds each group's last option with a non-zero weight, which guards
+    against group + uniform rounding up to the next group.
+    """
+
+    size: int
+    cdf: np.ndarray
+    last: np.ndarray
+
+    def rows(self, seed, key, offset, num_records, groups):
+        """
+        Option positions for rows [offset, offset + num_records), groups
+        holding the group index of each row
+        """
+        uniform = uniform_rows(seed, key, offset, num_records)
+        picks = self.cdf.searchsorted(groups + uniform, side="right")
+        return np.minimum(picks - groups * self.size, self.last[groups])
+
+
+def make_grouped_sampler(weights):
+    """
+    GroupedSampler from a (groups, options) matrix of weights
+    """
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim != 2 or weights.shape[1] == 0:
+        raise ValueError("no options to choose from")
+    totals = weights.sum(axis=1)
+    if (weights < 0).any() or (totals <= 0).any():
+        raise ValueError("weights must be non-negative and not all zero")
+    cdf = weights.cumsum(axis=1) / totals[:, None]
+    cdf[:, -1] = 1.0
+    cdf += np.arange(len(weights))[:, None]
+    last = weights.shape[1] - 1 - np.argmax(weights[:, ::-1] > 0, axis=1)
+    return GroupedSampler(weights.shape[1], cdf.ravel(), last)
@@ -0,0 +1,162 @@
+"""
+State manifests for extending a dataset without regenerating it.
+
+A run that writes a single output file also writes <output>.state.json
+next to it: the seed, the number of rows, the format and a hash of the
+rules, where the sequences stand (last `company` ID, next value of each
+`increment` column) and a fingerprint of every faker value pool. Every
+value is a function of the seed, its section and its row number, so
+`--extend N` only generates rows [rows, rows + N) and appends them: the
+result is the same as a fresh run of rows + N rows.
+
+Before anything is generated the manifest is checked against the current
+rules and environment, so an extension never silently continues a
+different dataset: changed rules, a changed output file or a different
+faker pool are reported as errors.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from importlib.metadata import PackageNotFoundError, version
+
+from fakerengine.fakerdata import faker_sources, get_faker_pool
+from fakerengine.plan import compile_plan, config_hash
+
+STATE_VERSION = 2
+STATE_SUFFIX = ".state.json"
+
+
+def state_path(output):
+    return output + STATE_SUFFIX
+
+
+def live_columns(plan):
+    dead = set(plan.dead)
+    return [col for col in plan.columns if col.index not in dead]
+
+
+def pool_digest(values):
+    return hashlib.sha256("\n".join(map(str, values)).encode()).hexdigest()[:16]
+
+
+def faker_version():
+    try:
+        return version("Faker")
+    except PackageNotFoundError:
+        return None
+
+
+def build_state(config, seed, rows, fmt, compression):
+    """
+    Manifest of a run of config that wrote rows rows with seed
+    """
+    plan = compile_plan(config)
+    cache_dir = config["rec"].get("pool_cache")
+    state = {
+        "version": STATE_VERSION,
+        "config_hash": config_hash(config),
+        "seed": seed,
+        "rows": rows,
+        "format": fmt,
+        "compression": compression,
+        "company": {},
+        "increment": {},
+        "pools": {},
+    }
+    for col in live_columns(plan):
+        if col.data == "company":
+            state["company"][col.section] = rows
+        elif col.data == "increment":
+            state["increment"][col.section] = col.start + col.interval * rows
+
+    per_row = False
+    for section, method, pool, locale in faker_sources(config, plan):
+        if not pool:
+            per_row = True
+            continue
+        values = get_faker_pool(method, pool, locale, cache_dir)
+        state["pools"][section] = {
+            "method": method,
+            "locale": locale,
+            "size": pool,
+            "sha256": pool_digest(values),
+        }
+    # Per-row faker values are only reproducible with the same Faker
+    if per_row:
+        state["faker"] = faker_version()
+    return state
+
+
+def write_state(output, state):
+    """
+    Save state as the manifest of output, recording the output's size
+    """
+    state = dict(state, size=os.path.getsize(output))
+    path = state_path(output)
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    with open(partial, "w") as f:
+        json.dump(state, f, indent=2)
+        f.write("\n")
+    os.replace(partial, path)
+    return path
+
+
+def read_state(output):
+    path = state_path(output)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"no state manifest '{path}'; only single-file outputs written "
+            "by this version can be extended"
+        )
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        raise ValueError(f"'{path}' has unsupported version {state.get('version')}")
+    return state
+
+
+def prepare_extension(config, output, rows, seed=None):
+    """
+    Check that rows more rows can be appended to output so that it matches
+    a fresh run, and set [rec] num to the new total. Returns the manifest
+    of the previous run; raises ValueError when extending would not match.
+    """
+    state = read_state(output)
+    path = state_path(output)
+    if rows < 0:
+        raise ValueError("the number of rows to add cannot be negative")
+    if seed is not None and seed != state["seed"]:
+        raise ValueError(f"seed {seed} differs from seed {state['seed']} in '{path}'")
+    if not os.path.exists(output) or os.path.getsize(output) != state["size"]:
+        raise ValueError(f"'{output}' has changed since '{path}' was written")
+
+    total = state["rows"] + rows
+    config["rec"]["num"] = str(total)
+    current = build_state(
+        config, state["seed"], state["rows"], state["format"], state["compression"]
+    )
+    if current["config_hash"] != state["config_hash"]:
+        raise ValueError(
+            f"the rules have changed since '{path}' was written; extending "
+            "would not match a fresh run"
+        )
+    for key in ("company", "increment"):
+        if current[key] != state[key]:
+            raise ValueError(
+                f"{key} sequences {current[key]} do not continue '{path}' "
+                f"({state[key]})"
+            )
+    for section, pool in state["pools"].items():
+        if current["pools"].get(section) != pool:
+            raise ValueError(
+                f"[{section}] the faker pool differs from the one in '{path}'; "
+                "was Faker upgraded?"
+            )
+    if current.get("faker") != state.get("faker"):
+        raise ValueError(
+            f"Faker {state.get('faker')} wrote '{output}' but {current.get('faker')} "
+            "is installed; faker columns without pool would differ"
+        )
+    return state
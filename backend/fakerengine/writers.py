@@ -0,0 +1,416 @@
+"""
+Chunk writers for CSV, compressed CSV, Parquet and Arrow IPC/Feather output.
+
+Writers take the DataFrame chunks produced by iter_chunks one at a time, so
+memory stays bounded by the chunk size. With partition_by the output path
+is a directory laid out as <col>=<value>/part-0.<ext> (Hive style, as read
+by Spark, DuckDB and pyarrow.dataset); the partition columns are encoded in
+the directory names and left out of the files.
+
+Files are written under a temporary <path>.<id>.partial name and renamed
+to their path once complete, so a failed run never leaves a short file
+that looks finished.
+
+With append, rows are added to an existing file instead. CSV files are
+appended to in place (a compressed CSV gets one more compressed stream)
+and cut back to their old size if writing fails. Parquet and Arrow files
+cannot grow in place: their row groups are copied into the new file ahead
+of the new rows, without regenerating anything.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import uuid
+
+from fakerengine.profiling import profiled_stage
+
+CSV_COMPRESSIONS = {None, "gzip", "bz2", "xz", "zstd"}
+PARQUET_COMPRESSIONS = {None, "snappy", "gzip", "brotli", "zstd", "lz4"}
+ARROW_COMPRESSIONS = {None, "zstd", "lz4"}
+COMPRESSIONS = {
+    "csv": CSV_COMPRESSIONS,
+    "parquet": PARQUET_COMPRESSIONS,
+    "feather": ARROW_COMPRESSIONS,
+}
+
+DEFAULT_COMPRESSION = {"csv": None, "parquet": "snappy", "feather": None}
+
+EXTENSIONS = {
+    ".csv": ("csv", None),
+    ".gz": ("csv", "gzip"),
+    ".bz2": ("csv", "bz2"),
+    ".xz": ("csv", "xz"),
+    ".zst": ("csv", "zstd"),
+    ".parquet": ("parquet", None),
+    ".feather": ("feather", None),
+    ".arrow": ("feather", None),
+    ".ipc": ("feather", None),
+}
+
+SUFFIXES = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+CSV_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow/Feather output require pyarrow (pip install pyarrow)"
+        ) from e
+    return pyarrow
+
+
+def normalize_compression(compression):
+    if compression in (None, "", "none"):
+        return None
+    return compression.lower()
+
+
+def guess_format(path):
+    """
+    Return (format, compression) implied by a file name, e.g. out.csv.gz
+    """
+    _, ext = os.path.splitext(path)
+    return EXTENSIONS.get(ext.lower(), ("csv", None))
+
+
+def default_output(stem, fmt, compression=None, partition_by=None):
+    if partition_by:
+        return stem
+    suffix = SUFFIXES[fmt]
+    if fmt == "csv" and compression:
+        suffix += CSV_SUFFIXES[compression]
+    return stem + suffix
+
+
+def partial_path(path):
+    return f"{path}.{uuid.uuid4().hex}.partial"
+
+
+def arrow_schema(pa, df):
+    """
+    Schema for the first chunk. Columns that are entirely empty in it are
+    typed as strings so later chunks with values still fit.
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for idx, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(idx, field.with_type(pa.string()))
+    return schema.remove_metadata()
+
+
+def append_schema(pa, existing, df):
+    """
+    Schema for appending df to a file with the existing schema: the same,
+    except integer columns that df needs wider, as compact company and
+    increment columns do when the row count grows
+    """
+    schema = existing.remove_metadata()
+    fields = pa.Schema.from_pandas(df, preserve_index=False)
+    if fields.names != schema.names:
+        raise ValueError(
+            f"cannot append columns {fields.names} to a file with {schema.names}"
+        )
+    for idx, field in enumerate(fields):
+        old = schema.field(idx)
+        if (
+            pa.types.is_integer(old.type)
+            and pa.types.is_integer(field.type)
+            and field.type.bit_width > old.type.bit_width
+        ):
+            schema = schema.set(idx, old.with_type(field.type))
+    return schema
+
+
+class CsvWriter:
+    def __init__(self, path, compression=None, append=False):
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"Unsupported CSV compression: {compression}")
+        mode = "at" if append else "wt"
+        # Where to cut an appended file back to if writing fails; new files
+        # are written under a temporary name instead
+        self.size = os.path.getsize(path) if append else None
+        self.target = None if append else path
+        self.path = path if append else partial_path(path)
+        path = self.path
+        if compression == "gzip":
+            self.handle = gzip.open(path, mode, newline="")
+        elif compression == "bz2":
+            self.handle = bz2.open(path, mode, newline="")
+        elif compression == "xz":
+            self.handle = lzma.open(path, mode, newline="")
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError(
+                    "zstd CSV output requires zstandard (pip install zstandard)"
+                ) from e
+            self.handle = zstandard.open(path, mode, newline="")
+        else:
+            self.handle = open(path, mode[0], newline="")
+        self.header = not append
+
+    def write(self, df):
+        df.to_csv(self.handle, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.handle.close()
+        if self.target is not None:
+            os.replace(self.path, self.target)
+
+    def discard(self):
+        self.handle.close()
+        if self.target is not None:
+            os.remove(self.path)
+        else:
+            os.truncate(self.path, self.size)
+
+
+class ArrowWriter:
+    """
+    Chunk handling shared by the Parquet and Arrow IPC writers. A file is
+    written under a temporary name and renamed to path on close; with
+    append, it starts with the row groups of the existing file at path.
+    path may also be a file object, which is written to directly.
+    """
+
+    def __init__(self, path, append=False):
+        self.pa = import_pyarrow()
+        self.append = append
+        self.path = path
+        self.target = None
+        if isinstance(path, (str, os.PathLike)):
+            self.target, self.path = path, partial_path(path)
+        self.writer = None
+
+    def write(self, df):
+        pa = self.pa
+        if self.writer is None:
+            if not self.append:
+                self.schema = arrow_schema(pa, df)
+                self.writer = self.open(self.schema)
+            else:
+                existing, tables = self.existing_tables()
+                self.schema = append_schema(pa, existing, df)
+                self.writer = self.open(self.schema)
+                for table in tables:
+                    self.writer.write_table(table.cast(self.schema))
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            if self.target is not None:
+                os.replace(self.path, self.target)
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+            if self.target is not None:
+                os.remove(self.path)
+
+
+class ParquetWriter(ArrowWriter):
+    def __init__(self, path, compression="snappy", append=False):
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"Unsupported Parquet compression: {compression}")
+        super().__init__(path, append)
+        self.compression = compression or "none"
+
+    def open(self, schema):
+        return self.pa.parquet.ParquetWriter(
+            self.path, schema, compression=self.compression
+        )
+
+    def existing_tables(self):
+        source = self.pa.parquet.ParquetFile(self.target)
+        tables = (source.read_row_group(i) for i in range(source.num_row_groups))
+        return source.schema_arrow, tables
+
+
+class FeatherWriter(ArrowWriter):
+    """
+    Arrow IPC file format, which is what Feather v2 files are
+    """
+
+    def __init__(self, path, compression=None, append=False):
+        if compression not in ARROW_COMPRESSIONS:
+            raise ValueError(f"Unsupported Arrow/Feather compression: {compression}")
+        super().__init__(path, append)
+        self.options = self.pa.ipc.IpcWriteOptions(compression=compression)
+
+    def open(self, schema):
+        return self.pa.ipc.new_file(self.path, schema, options=self.options)
+
+    def existing_tables(self):
+        source = self.pa.ipc.open_file(self.pa.memory_map(self.target))
+        tables = (
+            self.pa.Table.from_batches([source.get_batch(i)])
+            for i in range(source.num_record_batches)
+        )
+        return source.schema, tables
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+    "feather": FeatherWriter,
+}
+
+
+class StreamSink(io.RawIOBase):
+    """
+    Write-only file object that hands out what has been written so far.
+    Used to stream formats such as Parquet whose writers need a file.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_encoded(chunks, fmt="csv", compression=None):
+    """
+    Encode DataFrame chunks as a byte stream, yielding once per chunk.
+    fmt is "csv", "ndjson" or "parquet"; only one chunk is held at a time.
+    """
+    if fmt == "csv":
+        header = True
+        for df in chunks:
+            yield df.to_csv(index=False, header=header).encode()
+            header = False
+
+    elif fmt == "ndjson":
+        for df in chunks:
+            if len(df):
+                yield df.to_json(
+                    orient="records", lines=True, date_format="iso"
+                ).rstrip("\n").encode() + b"\n"
+
+    elif fmt == "parquet":
+        sink = StreamSink()
+        writer = ParquetWriter(sink, normalize_compression(compression or "snappy"))
+        for df in chunks:
+            writer.write(df)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+    else:
+        raise ValueError(f"Unsupported stream format: {fmt}")
+
+
+def partition_dir(partition_by, values):
+    parts = []
+    for col, value in zip(partition_by, values):
+        if value is None or value == "" or value != value:
+            value = "__HIVE_DEFAULT_PARTITION__"
+        value = str(value)
+        parts.append(f"{col}={value.replace('/', '_')}")
+    return os.path.join(*parts)
+
+
+def write_chunks(
+    chunks,
+    output,
+    fmt=None,
+    compression=None,
+    partition_by=None,
+    on_chunk=None,
+    profile=None,
+    append=False,
+):
+    """
+    Write DataFrame chunks to output and return the number of rows written.
+
+    fmt is "csv", "parquet" or "feather" (Arrow IPC); when omitted it is
+    guessed from the output file name. compression is the codec for that
+    format. partition_by is a list of column names; output is then a
+    directory with one file per distinct combination of their values.
+    on_chunk, if given, is called with every chunk before it is written.
+    profile, a fakerengine.profiling.Profile, records the time spent writing.
+    append adds the rows to the existing output file instead of replacing
+    it; if writing fails, the file is left as it was.
+    """
+    if fmt is None:
+        fmt, guessed = guess_format(output)
+        compression = compression or guessed
+    fmt = {"arrow": "feather", "ipc": "feather"}.get(fmt, fmt)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    compression = normalize_compression(compression or DEFAULT_COMPRESSION[fmt])
+    writer_class = WRITERS[fmt]
+    if append and partition_by:
+        raise ValueError("partitioned output cannot be appended to")
+
+    writers = {}
+    total = 0
+    try:
+        for df in chunks:
+            if on_chunk is not None:
+                on_chunk(df)
+            total += len(df)
+
+            with profiled_stage(profile, "write", len(df)):
+                if not partition_by:
+                    if None not in writers:
+                        writers[None] = writer_class(output, compression, append)
+                    writers[None].write(df)
+                    continue
+
+                data_cols = [col for col in df.columns if col not in partition_by]
+                groups = df.groupby(list(partition_by), sort=False, dropna=False)
+                for values, part in groups:
+                    values = values if isinstance(values, tuple) else (values,)
+                    if values not in writers:
+                        directory = os.path.join(
+                            output, partition_dir(partition_by, values)
+                        )
+                        os.makedirs(directory, exist_ok=True)
+                        path = os.path.join(
+                            directory, default_output("part-0", fmt, compression)
+                        )
+                        writers[values] = writer_class(path, compression)
+                    writers[values].write(part[data_cols])
+
+        if not writers and not partition_by:
+            # Nothing was generated: still leave an (empty) output file
+            writer_class(output, compression, append).close()
+    except BaseException:
+        for writer in writers.values():
+            writer.discard()
+        raise
+    for writer in writers.values():
+        writer.close()
+
+    return total
@@ -0,0 +1,252 @@
+"""
+Background generation jobs for the API.
+
+Jobs run in a bounded process pool so large datasets do not tie up the
+FastAPI threadpool. Each job writes its output chunk by chunk into its own
+directory of the artifact store, reports rows done through a shared
+progress table and checks for cancellation between chunks.
+
+Settings are read from the environment:
+    FAKERDATA_JOB_WORKERS   processes generating at the same time (default 2)
+    FAKERDATA_MAX_JOBS      queued + running jobs accepted (default 16)
+    FAKERDATA_JOB_DIR       artifact store (default <tmp>/fakerdata_jobs)
+    FAKERDATA_JOB_TTL       seconds a finished job and its output are kept
+                            (default 3600)
+    FAKERDATA_MAX_FINISHED  finished jobs kept at most, oldest removed first
+                            (default 100)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import configparser
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from fakerengine.fakerdata import config_to_string, get_seed, iter_chunks
+from fakerengine.writers import default_output, write_chunks
+
+JOB_WORKERS = int(os.environ.get("FAKERDATA_JOB_WORKERS", "2"))
+MAX_JOBS = int(os.environ.get("FAKERDATA_MAX_JOBS", "16"))
+JOB_DIR = os.environ.get(
+    "FAKERDATA_JOB_DIR", os.path.join(tempfile.gettempdir(), "fakerdata_jobs")
+)
+JOB_TTL = float(os.environ.get("FAKERDATA_JOB_TTL", "3600"))
+MAX_FINISHED = int(os.environ.get("FAKERDATA_MAX_FINISHED", "100"))
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+def run_job(
+    job_id, config_string, output, fmt, compression, chunk_size, seed, progress, cancel
+):
+    """
+    Worker entry point: generate one job's dataset into output, recording
+    (rows done, start time) in progress after every chunk
+    """
+    config = configparser.ConfigParser()
+    config.read_string(config_string)
+    started = time.time()
+    rows = 0
+    progress[job_id] = (rows, started)
+
+    def on_chunk(df):
+        nonlocal rows
+        if cancel.is_set():
+            raise JobCancelled(job_id)
+        rows += len(df)
+        progress[job_id] = (rows, started)
+
+    chunks = iter_chunks(config, chunk_size, seed)
+    return write_chunks(chunks, output, fmt, compression, on_chunk=on_chunk)
+
+
+class JobQueue:
+    """
+    Registry of jobs submitted to this API process
+    """
+
+    def __init__(
+        self,
+        workers=JOB_WORKERS,
+        max_jobs=MAX_JOBS,
+        directory=JOB_DIR,
+        ttl=JOB_TTL,
+        max_finished=MAX_FINISHED,
+    ):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.directory = directory
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pool = None
+        self.manager = None
+        self.progress = None
+
+    def start(self):
+        if self.pool is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.manager = multiprocessing.Manager()
+            self.progress = self.manager.dict()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self):
+        if self.pool is not None:
+            for job_id in list(self.jobs):
+                self.cancel(job_id)
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.manager.shutdown()
+            self.pool = None
+
+    def active(self):
+        return sum(1 for job in self.jobs.values() if not job["future"].done())
+
+    def submit(self, config, fmt="csv", compression=None, chunk_size=None):
+        self.evict()
+        with self.lock:
+            if self.active() >= self.max_jobs:
+                raise QueueFull(
+                    f"{self.max_jobs} jobs are already queued or running, "
+                    "try again later"
+                )
+            self.start()
+
+            job_id = uuid.uuid4().hex
+            directory = os.path.join(self.directory, job_id)
+            os.makedirs(directory)
+            output = os.path.join(directory, default_output("data", fmt, compression))
+            seed = get_seed(config)
+            cancel = self.manager.Event()
+
+            future = self.pool.submit(
+                run_job,
+                job_id,
+                config_to_string(config),
+                output,
+                fmt,
+                compression,
+                chunk_size,
+                seed,
+                self.progress,
+                cancel,
+            )
+            self.jobs[job_id] = {
+                "id": job_id,
+                "future": future,
+                "cancel": cancel,
+                "output": output,
+                "directory": directory,
+                "format": fmt,
+                "rows": int(config["rec"]["num"]),
+                "seed": seed,
+                "submitted": time.time(),
+                "finished": None,
+                "cancelled": False,
+            }
+            future.add_done_callback(lambda _: self.finish(job_id))
+            return self.status(job_id)
+
+    def finish(self, job_id):
+        job = self.jobs[job_id]
+        job["finished"] = time.time()
+        if job["cancelled"]:
+            shutil.rmtree(job["directory"], ignore_errors=True)
+
+    def state(self, job):
+        future = job["future"]
+        if job["cancelled"]:
+            return "cancelled" if future.done() else "cancelling"
+        if not future.done():
+            return "running" if future.running() else "queued"
+        if future.exception() is not None:
+            return "failed"
+        return "done"
+
+    def status(self, job_id):
+        job = self.jobs[job_id]
+        state = self.state(job)
+        done, started = self.progress.get(job_id, (0, None))
+        total = job["rows"]
+        if state == "done":
+            done = total
+
+        rate = None
+        eta = None
+        if started is not None:
+            elapsed = (job["finished"] or time.time()) - started
+            if elapsed > 0 and done:
+                rate = done / elapsed
+                if state == "done":
+                    eta = 0.0
+                elif state == "running":
+                    eta = (total - done) / rate
+
+        status = {
+            "id": job_id,
+            "status": state,
+            "rows_done": done,
+            "rows_total": total,
+            "rows_per_second": round(rate, 1) if rate else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "format": job["format"],
+            "seed": job["seed"],
+        }
+        if state == "failed":
+            status["error"] = str(job["future"].exception())
+        return status
+
+    def cancel(self, job_id):
+        job = self.jobs[job_id]
+        if job["future"].done():
+            return self.status(job_id)
+        job["cancelled"] = True
+        job["cancel"].set()
+        # A queued job never starts; a running one stops at its next chunk
+        job["future"].cancel()
+        return self.status(job_id)
+
+    def result_path(self, job_id):
+        job = self.jobs[job_id]
+        if self.state(job) != "done":
+            return None
+        return job["output"]
+
+    def delete(self, job_id):
+        """
+        Forget a finished job and remove its artifacts
+        """
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return
+        self.progress.pop(job_id, None)
+        shutil.rmtree(job["directory"], ignore_errors=True)
+
+    def evict(self, now=None):
+        """
+        Delete finished jobs older than ttl, then the oldest ones beyond
+        max_finished, so a long-running server does not keep every output
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            finished = sorted(
+                (job["finished"], job_id)
+                for job_id, job in self.jobs.items()
+                if job["finished"] is not None
+            )
+            expired = [job_id for when, job_id in finished if now - when > self.ttl]
+            kept = [job_id for when, job_id in finished if now - when <= self.ttl]
+            expired += kept[: max(0, len(kept) - self.max_finished)]
+            for job_id in expired:
+                self.delete(job_id)
+            return expired
@@ -1,22 +1,23 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 import tempfile
 import os
 import uuid
 import sys
-import pandas as pd
-import numpy as np
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from typing import List, Optional, Union
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 import configparser
 import io
+import logging
 
 # Add the current directory to Python path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 # CORS middleware
@@ -32,20 +33,30 @@ app.add_middleware(
 # Pydantic models
 class Column(BaseModel):
     name: str
-    dtype: str = "str"
+    dtype: Optional[str] = None
     data: str = "random"
     options: List[str] = []
     weights: List[int] = []
     faker_method: str = "name"
+    pool: Optional[int] = None
     cols: Optional[int] = None
     value: List[str] = []
     range: List[str] = []
     condition: Optional[str] = None
     operation: Optional[str] = None
     operands: List[str] = []
-    start: Optional[int] = None
+    start: Optional[Union[int, str]] = None
+    end: Optional[str] = None
     interval: Optional[int] = None
     column_position: Optional[int] = None
+    expr: Optional[str] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    precision: Optional[Union[int, str]] = None
+    weight_table: Optional[str] = None
+    unique: bool = False
     valueMappingPairs: Optional[List[dict]] = []
 class AppendRule(BaseModel):
     operation: str
@@ -58,14 +69,23 @@ class AppendRule(BaseModel):
     options: List[str] = []
     weights: List[int] = []
     faker_method: str = "name"
+    pool: Optional[int] = None
     nullable: float = 0.0
     append_position: Optional[int] = None
 
+class ColumnGroup(BaseModel):
+    columns: List[int]
+    # One correlation for every pair, or the full matrix
+    correlation: Union[float, List[List[float]]]
+
 class RuleFile(BaseModel):
     num_records: int = 100
     mode: int = 1
+    seed: Optional[int] = None
+    compact: bool = False
     columns: List[Column] = []
     append_rules: List[AppendRule] = []
+    groups: List[ColumnGroup] = []
     reorder: List[int] = []
 
 
@@ -74,17 +94,63 @@ try:
     from fakerengine.fakerdata import (
         create_config_from_dict,
         save_config_to_file,
-        build_from_config_object,
+        build_chunk,
+        iter_chunks,
     )
+    from fakerengine.lazy import lazy_import
+    from fakerengine.plan import DISTRIBUTIONS, compile_plan
+    from fakerengine.profiling import Profile
+    from fakerengine.writers import (
+        COMPRESSIONS,
+        WRITERS,
+        iter_encoded,
+        normalize_compression,
+    )
+    from jobs import JobQueue, QueueFull
+
+    # pandas/numpy load on first use, keeping worker start-up fast
+    pd = lazy_import("pandas")
+    np = lazy_import("numpy")
 
-    print("✅ Successfully imported fakerengine")
+    logger.info("✅ Successfully imported fakerengine")
 except ImportError as e:
-    print(f"❌ Failed to import fakerengine: {e}")
-    print("Current directory:", os.getcwd())
-    print("Python path:", sys.path)
-    print("Files in current directory:", os.listdir("."))
+    logger.error("❌ Failed to import fakerengine: %s", e)
+    logger.error("Current directory: %s", os.getcwd())
+    logger.error("Python path: %s", sys.path)
+    logger.error("Files in current directory: %s", os.listdir("."))
     if os.path.exists("fakerengine"):
-        print("Files in fakerengine:", os.listdir("fakerengine"))
+        logger.error("Files in fakerengine: %s", os.listdir("fakerengine"))
+
+
+STREAM_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def rule_file_to_config(rule_file):
+    """Build a config object for the full dataset described by rule_file"""
+    return create_config_from_dict(
+        {
+            "num_records": rule_file.num_records,
+            "mode": rule_file.mode,
+            "seed": rule_file.seed,
+            "compact": rule_file.compact,
+            "columns": [col.dict() for col in rule_file.columns],
+            "append_rules": [rule.dict() for rule in rule_file.append_rules],
+            "groups": [group.dict() for group in rule_file.groups],
+            "reorder": rule_file.reorder,
+        }
+    )
+
+
+job_queue = JobQueue()
+
+
+@app.on_event("shutdown")
+def stop_jobs():
+    job_queue.shutdown()
 
 
 @app.get("/")
@@ -96,14 +162,17 @@ def root():
 def generate_ini_file(rule_file: RuleFile):
     """Generate and return rules.ini file"""
     try:
-        print(f"Received request with {len(rule_file.columns)} columns")
+        logger.debug("Received request with %d columns", len(rule_file.columns))
 
         # Convert to dict format
         config_dict = {
             "num_records": rule_file.num_records,
             "mode": rule_file.mode,
+            "seed": rule_file.seed,
+            "compact": rule_file.compact,
             "columns": [col.dict() for col in rule_file.columns],
             "append_rules": [rule.dict() for rule in rule_file.append_rules],
+            "groups": [group.dict() for group in rule_file.groups],
             "reorder": rule_file.reorder,
         }
 
@@ -117,20 +186,17 @@ def generate_ini_file(rule_file: RuleFile):
 
         save_config_to_file(config, filepath)
 
-        print(f"Generated file at: {filepath}")
+        logger.debug("Generated file at: %s", filepath)
 
         return FileResponse(filepath, media_type="text/plain", filename="rules.ini")
 
     except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/preview-data")
-def preview_data(rule_file: RuleFile):
+def preview_data(rule_file: RuleFile, profile: bool = Query(False)):
     """Generate preview data using the existing fakerdata logic"""
     try:
         # FIXED: Ensure columns maintain their order
@@ -140,12 +206,16 @@ def preview_data(rule_file: RuleFile):
             # Ensure we maintain the 1-based indexing that operands expect
             columns_with_order.append(col_dict)
 
-        # Convert to dict format with limited records for preview
+        # Keep the real record count: only the first rows are generated, and
+        # they match the first rows of the full dataset
         config_dict = {
-            "num_records": min(rule_file.num_records, 25),
+            "num_records": rule_file.num_records,
             "mode": rule_file.mode,
+            "seed": rule_file.seed,
+            "compact": rule_file.compact,
             "columns": columns_with_order,  # Maintains order
             "append_rules": [rule.dict() for rule in rule_file.append_rules],
+            "groups": [group.dict() for group in rule_file.groups],
             "reorder": rule_file.reorder,
         }
 
@@ -159,11 +229,19 @@ def preview_data(rule_file: RuleFile):
             }
 
         # Create config object
-        print(f"config_dict > {config_dict}")
+        logger.debug("config_dict > %s", config_dict)
         config = create_config_from_dict(config_dict)
 
-        # Generate data using existing logic
-        df = build_from_config_object(config)
+        # Generate data using existing logic. tracemalloc is process-wide and
+        # requests run concurrently, so the API profile records times only
+        run_profile = Profile(memory=False) if profile else None
+        try:
+            df = build_chunk(
+                config, min(rule_file.num_records, 25), 0, profile=run_profile
+            )
+        finally:
+            if run_profile is not None:
+                run_profile.close()
 
         # Convert to serializable format
         preview_data = df.head(15).to_dict(orient="records")  # Show first 15 rows
@@ -176,18 +254,18 @@ def preview_data(rule_file: RuleFile):
                 elif isinstance(value, (np.integer, np.floating)):
                     row[key] = value.item()
 
-        return {
+        response = {
             "preview_data": preview_data,
             "columns": df.columns.tolist(),
             "shape": df.shape,
             "message": f"Preview of {len(preview_data)} rows",
         }
+        if run_profile is not None:
+            response["profile"] = run_profile.report()
+        return response
 
     except Exception as e:
-        print(f"Preview error: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("Preview error: %s", e)
         return {
             "preview_data": [],
             "columns": [],
@@ -222,6 +300,8 @@ async def parse_ini_file(file: UploadFile = File(...)):
         rec_section = config["rec"]
         num_records = int(rec_section.get("num", 100))
         mode = int(rec_section.get("mode", 1))
+        seed = int(rec_section["seed"]) if rec_section.get("seed") else None
+        compact = rec_section.getboolean("compact", fallback=False)
 
         # Extract [cX] sections (columns) - PRESERVE ORDER WITH POSITION TRACKING
         columns = []
@@ -238,8 +318,10 @@ async def parse_ini_file(file: UploadFile = File(...)):
         # Sort by column number to ensure proper order (c1, c2, c3, ...)
         column_sections.sort(key=lambda x: x[0])
 
-        print(
-            f"📋 Found {len(column_sections)} columns in order: {[f'{name} (pos {num})' for num, name in column_sections]}"
+        logger.debug(
+            "📋 Found %d columns in order: %s",
+            len(column_sections),
+            [f"{name} (pos {num})" for num, name in column_sections],
         )
 
         for column_number, section_name in column_sections:
@@ -247,7 +329,9 @@ async def parse_ini_file(file: UploadFile = File(...)):
 
             column = {
                 "name": section.get("name", ""),
-                "dtype": section.get("dtype", "str"),
+                "dtype": section.get(
+                    "dtype", DISTRIBUTIONS.get(section.get("data"), "str")
+                ),
                 "data": section.get("data", "random"),
                 "column_position": column_number,  # 🔥 ADD THIS: Preserve original position
                 "options": (
@@ -261,6 +345,7 @@ async def parse_ini_file(file: UploadFile = File(...)):
                     else []
                 ),
                 "faker_method": section.get("faker_method", "name"),
+                "pool": int(section.get("pool")) if section.get("pool") else None,
                 "cols": (int(section.get("cols", 0)) if section.get("cols") else None),
                 "value": (
                     section.get("value", "").split(",") if section.get("value") else []
@@ -280,11 +365,26 @@ async def parse_ini_file(file: UploadFile = File(...)):
                     else []
                 ),
                 "start": (
-                    int(section.get("start", 0)) if section.get("start") else None
+                    int(section.get("start"))
+                    if section.get("start", "").lstrip("-").isdigit()
+                    else section.get("start") or None
                 ),
+                "end": section.get("end"),
                 "interval": (
                     int(section.get("interval", 1)) if section.get("interval") else None
                 ),
+                "expr": section.get("expr"),
+                "weight_table": section.get("weight_table"),
+                "unique": section.getboolean("unique", fallback=False),
+                "min": section.getfloat("min"),
+                "max": section.getfloat("max"),
+                "mean": section.getfloat("mean"),
+                "std": section.getfloat("std"),
+                "precision": (
+                    int(section.get("precision"))
+                    if section.get("precision", "").isdigit()
+                    else section.get("precision")
+                ),
             }
             
             if column["value"] and column["range"] and column["data"] == "reference":
@@ -295,7 +395,7 @@ async def parse_ini_file(file: UploadFile = File(...)):
                         "sourceValue": source_value.strip(),
                         "mappedValue": mapped_value.strip()
                     })
-                print(f"Created {len(column['valueMappingPairs'])} value mapping pairs for {column['name']}")
+                logger.debug("Created %d value mapping pairs for %s", len(column["valueMappingPairs"]), column["name"])
             else:
                 column["valueMappingPairs"] = []
                 
@@ -312,8 +412,11 @@ async def parse_ini_file(file: UploadFile = File(...)):
                 column["operands"] = []
 
             columns.append(column)
-            print(
-                f"✅ Parsed column {column_number}: {column['name']} (position {column['column_position']})"
+            logger.debug(
+                "✅ Parsed column %d: %s (position %s)",
+                column_number,
+                column["name"],
+                column["column_position"],
             )
 
         # Extract [aX] sections (append rules) - ALSO PRESERVE ORDER
@@ -358,6 +461,7 @@ async def parse_ini_file(file: UploadFile = File(...)):
                     else []
                 ),
                 "faker_method": section.get("faker_method", "name"),
+                "pool": int(section.get("pool")) if section.get("pool") else None,
                 "nullable": (
                     float(section.get("nullable", 0.0))
                     if section.get("nullable")
@@ -367,6 +471,27 @@ async def parse_ini_file(file: UploadFile = File(...)):
 
             append_rules.append(rule)
 
+        # Extract [gX] correlated column groups
+        groups = []
+        for section_name in config.sections():
+            if section_name.startswith("g") and section_name[1:].isdigit():
+                section = config[section_name]
+                rows = [
+                    [float(x) for x in row.split(",")]
+                    for row in section.get("correlation", "").replace(";", "\n").splitlines()
+                    if row.strip()
+                ]
+                groups.append(
+                    {
+                        "columns": [
+                            int(x) for x in section.get("columns", "").split(",") if x.strip()
+                        ],
+                        "correlation": (
+                            rows[0][0] if len(rows) == 1 and len(rows[0]) == 1 else rows
+                        ),
+                    }
+                )
+
         # Extract [reorder] section
         reorder = []
         if "reorder" in config.sections():
@@ -375,8 +500,9 @@ async def parse_ini_file(file: UploadFile = File(...)):
                 reorder = [int(x.strip()) for x in reorder_str.split(",") if x.strip()]
 
         # 🔍 Debug: Print final column order
-        print(
-            f"🎯 Final column order: {[(col['column_position'], col['name']) for col in columns]}"
+        logger.debug(
+            "🎯 Final column order: %s",
+            [(col["column_position"], col["name"]) for col in columns],
         )
 
         return {
@@ -384,8 +510,11 @@ async def parse_ini_file(file: UploadFile = File(...)):
             "data": {
                 "num_records": num_records,
                 "mode": mode,
+                "seed": seed,
+                "compact": compact,
                 "columns": columns,
                 "append_rules": append_rules,
+                "groups": groups,
                 "reorder": reorder,
             },
             "message": f"Successfully parsed {len(columns)} columns and {len(append_rules)} append rules in correct order",
@@ -401,3 +530,97 @@ async def parse_ini_file(file: UploadFile = File(...)):
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing INI file: {str(e)}")
+
+
+@app.post("/generate-data")
+def generate_data_stream(
+    rule_file: RuleFile,
+    format: str = Query("csv"),
+    chunk_size: int = Query(10000, ge=1, le=100000),
+):
+    """Stream the full dataset as CSV, NDJSON or Parquet while it is generated"""
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(STREAM_MEDIA_TYPES)}",
+        )
+    if not rule_file.columns:
+        raise HTTPException(status_code=400, detail="No columns defined")
+
+    config = rule_file_to_config(rule_file)
+    try:
+        # Surface config errors as a 400 before the response starts
+        compile_plan(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Chunks are generated lazily as the client reads the body, so at most
+    # one chunk of rows is held in memory and slow clients slow generation.
+    chunks = iter_chunks(config, chunk_size)
+    return StreamingResponse(
+        iter_encoded(chunks, format),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="data.{format}"'},
+    )
+
+
+@app.post("/jobs", status_code=202)
+def create_job(
+    rule_file: RuleFile,
+    format: str = Query("csv"),
+    compression: Optional[str] = Query(None),
+    chunk_size: Optional[int] = Query(None, ge=1),
+):
+    """Queue generation of the full dataset and return the job ID"""
+    if format not in WRITERS:
+        raise HTTPException(
+            status_code=400, detail=f"format must be one of {', '.join(WRITERS)}"
+        )
+    compression = normalize_compression(compression)
+    if compression not in COMPRESSIONS[format]:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported {format} compression: {compression}"
+        )
+    if not rule_file.columns:
+        raise HTTPException(status_code=400, detail="No columns defined")
+
+    config = rule_file_to_config(rule_file)
+    try:
+        compile_plan(config)
+        return job_queue.submit(config, format, compression, chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+def get_job(job_id):
+    job_queue.evict()
+    if job_id not in job_queue.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job_id
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """Rows done, rows/sec and ETA of a job"""
+    return job_queue.status(get_job(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """Download the output of a finished job"""
+    path = job_queue.result_path(get_job(job_id))
+    if path is None:
+        raise HTTPException(status_code=409, detail="Job has not finished")
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+@app.delete("/jobs/{job_id}")
+def delete_job(job_id: str):
+    """Cancel a queued or running job, or remove a finished job's output"""
+    status = job_queue.status(get_job(job_id))
+    if status["status"] in ("queued", "running", "cancelling"):
+        return job_queue.cancel(job_id)
+    job_queue.delete(job_id)
+    return {"id": job_id, "status": "deleted"}
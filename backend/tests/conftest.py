@@ -0,0 +1,58 @@
+import configparser
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+RULES = os.path.join(os.path.dirname(BACKEND_DIR), "rules.ini")
+
+
+def make_config(num=3000, seed=7, mode=2):
+    """
+    The shipped rules.ini at a small size, plus columns for the newer
+    sources (distributions, increment, unique, conditional_random)
+    """
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(RULES)
+    config["rec"]["num"] = str(num)
+    config["rec"]["seed"] = str(seed)
+    config["rec"]["mode"] = str(mode)
+    # Per-row faker values are slow; the pool keeps the tests quick
+    config["a3"]["pool"] = "200"
+    config["c18"] = {
+        "name": "Seq",
+        "dtype": "int",
+        "data": "increment",
+        "start": "100",
+        "interval": "3",
+    }
+    config["c19"] = {"name": "Amount", "data": "lognormal", "mean": "4"}
+    config["c20"] = {
+        "name": "Day",
+        "data": "date_range",
+        "start": "2024-01-01",
+        "end": "2024-12-31",
+    }
+    config["c21"] = {
+        "name": "Email",
+        "data": "faker",
+        "faker_method": "email",
+        "unique": "true",
+        "pool": "500",
+    }
+    config["c22"] = {
+        "name": "Channel",
+        "data": "conditional_random",
+        "cols": "2",
+        "options": "Web,Phone,Mail",
+        "weight_table": "Website: 8,1,1; *: 1,1,1",
+    }
+    return config
+
+
+@pytest.fixture
+def config():
+    return make_config()
@@ -0,0 +1,67 @@
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from fakerengine.fakerdata import build_dataframe, create_config_from_dict  # noqa: E402
+
+RULES = {
+    "num_records": 5000,
+    "mode": 1,
+    "seed": 11,
+    "columns": [
+        {"name": "ID", "dtype": "int", "data": "company"},
+        {"name": "Email", "data": "faker", "faker_method": "email", "unique": True},
+        {"name": "Code", "options": ["A", "B", "C"], "unique": True},
+        {"name": "Amount", "data": "normal", "mean": 100, "std": 15},
+        {
+            "name": "Day",
+            "data": "date_range",
+            "start": "2024-01-01",
+            "end": "2024-12-31",
+        },
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def test_preview_matches_first_rows_of_full_run(client):
+    preview = client.post("/preview-data", json=RULES).json()
+    assert "error" not in preview
+    config = create_config_from_dict(
+        {**RULES, "append_rules": [], "groups": [], "reorder": None}
+    )
+    full = build_dataframe(config)
+    assert preview["shape"] == [25, len(full.columns)]
+    assert [row["ID"] for row in preview["preview_data"]] == list(range(1, 16))
+    for column in ("Email", "Code", "Amount"):
+        expected = full[column].head(15).tolist()
+        assert [row[column] for row in preview["preview_data"]] == expected
+
+
+def test_distribution_columns_default_to_numbers(client):
+    preview = client.post("/preview-data", json=RULES).json()
+    assert isinstance(preview["preview_data"][0]["Amount"], float)
+
+
+def test_ndjson_dates_are_iso(client):
+    response = client.post("/generate-data?format=ndjson", json=RULES)
+    first = response.text.splitlines()[0]
+    assert '"Day":"2024-' in first
+
+
+def test_profiled_preview_leaves_tracing_off(client):
+    preview = client.post("/preview-data?profile=true", json=RULES).json()
+    assert preview["profile"]["stages"][0]["peak_bytes"] is None
+    broken = {**RULES, "columns": [{"name": "X", "data": "expression", "expr": "q"}]}
+    preview = client.post("/preview-data?profile=true", json=broken).json()
+    assert "error" in preview
+    assert not tracemalloc.is_tracing()
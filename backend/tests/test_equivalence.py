@@ -0,0 +1,168 @@
+"""
+Every value is a function of the seed, its section and its row number, so
+the same rows must come out however the dataset is generated: in one go,
+in chunks, in worker shards, as a preview, pruned, or extended later.
+"""
+
+import configparser
+import filecmp
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from conftest import make_config
+from fakerengine.fakerdata import (
+    build_chunk,
+    build_dataframe,
+    build_faker_pool,
+    faker_values,
+    get_faker_pool,
+    iter_chunks,
+    iter_parallel_chunks,
+    main,
+)
+from fakerengine.plan import compile_plan
+
+
+def test_chunked_and_parallel_match_full(config):
+    full = build_dataframe(config)
+    chunked = pd.concat(iter_chunks(config, 777))
+    parallel = pd.concat(iter_parallel_chunks(config, 2, 1000))
+    pd.testing.assert_frame_equal(chunked, full)
+    pd.testing.assert_frame_equal(parallel, full)
+
+
+def test_preview_matches_head(config):
+    full = build_dataframe(config)
+    pd.testing.assert_frame_equal(build_chunk(config, 25, 0), full.head(25))
+
+
+def test_rows_do_not_depend_on_num():
+    small = build_dataframe(make_config(num=25))
+    full = build_dataframe(make_config(num=3000))
+    pd.testing.assert_frame_equal(small, full.head(25))
+
+
+def test_unique_columns_have_no_duplicates():
+    # More rows than the e-mail pool, so suffixed values are used too
+    df = pd.concat(iter_parallel_chunks(make_config(num=1500), 2, 400))
+    assert df["Email"].is_unique
+    assert df["Email"].str.contains("-").any()
+
+
+def test_faker_values_match_across_threads():
+    # API requests run in a thread pool, and Faker is reseeded per row
+    expected = faker_values("name", 1000, 1, 7)
+    pool = build_faker_pool("name", 300).tolist()
+    with ThreadPoolExecutor(4) as executor:
+        rows = executor.map(lambda _: faker_values("name", 1000, 1, 7), range(4))
+        pools = executor.map(lambda _: build_faker_pool("name", 300), range(4))
+        assert all(values == expected for values in rows)
+        assert all(values.tolist() == pool for values in pools)
+
+
+@pytest.mark.parametrize(
+    "method, dtype",
+    [("name", "string"), ("pyint", "Int64"), ("date_object", "datetime64[s]")],
+)
+def test_generated_columns_keep_their_type(method, dtype):
+    config = make_config(num=200)
+    config["a9"] = {
+        "operation": "generate",
+        "new_col": "Extra",
+        "data": "faker",
+        "faker_method": method,
+        "pool": "50",
+        "nullable": "0.3",
+    }
+    chunked = pd.concat(iter_chunks(config, 64))
+    assert str(chunked["Extra"].dtype) == dtype
+    assert chunked["Extra"].isna().any()
+    pd.testing.assert_frame_equal(chunked, build_dataframe(config))
+
+
+def test_pruned_matches_unpruned():
+    pruned_config = make_config(mode=3)
+    assert compile_plan(pruned_config).pruned
+    pruned = build_dataframe(pruned_config)
+
+    unpruned_config = make_config(mode=2)
+    full = build_dataframe(unpruned_config)
+    pd.testing.assert_frame_equal(pruned, full[pruned.columns.tolist()])
+
+
+def test_compact_csv_matches(config):
+    plain = build_dataframe(config)
+    config["rec"]["compact"] = "true"
+    compact = build_dataframe(config)
+    assert compact.to_csv(index=False) == plain.to_csv(index=False)
+
+
+def write_rules(path, num):
+    config = make_config(num=num)
+    with open(path, "w") as f:
+        config.write(f)
+    return str(path)
+
+
+def cli(*args):
+    assert main([*args, "--log-level", "WARNING"]) == 0
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.csv.gz", "out.parquet"])
+def test_extend_matches_fresh_run(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    small = write_rules(tmp_path / "small.ini", 1200)
+    full = write_rules(tmp_path / "full.ini", 3000)
+    extended, fresh = str(tmp_path / name), str(tmp_path / f"fresh_{name}")
+
+    cli("--config", small, "--output", extended, "--compact")
+    cli("--config", small, "--output", extended, "--compact", "--extend", "1000")
+    cli("--config", small, "--output", extended, "--compact", "--extend", "800")
+    cli("--config", full, "--output", fresh, "--compact")
+
+    if name.endswith(".parquet"):
+        pq = pytest.importorskip("pyarrow.parquet")
+        assert pq.read_table(extended).equals(pq.read_table(fresh))
+    elif name.endswith(".gz"):
+        pd.testing.assert_frame_equal(pd.read_csv(extended), pd.read_csv(fresh))
+    else:
+        assert filecmp.cmp(extended, fresh, shallow=False)
+
+
+def test_extend_refuses_changed_rules(tmp_path):
+    rules = write_rules(tmp_path / "rules.ini", 500)
+    output = str(tmp_path / "out.csv")
+    cli("--config", rules, "--output", output)
+
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(rules)
+    config["c18"]["interval"] = "4"
+    with open(rules, "w") as f:
+        config.write(f)
+    assert main(["--config", rules, "--output", output, "--extend", "10"]) == 1
+
+
+@pytest.mark.parametrize("option", [["--extend", "10"], ["--partition-by", "ID"]])
+def test_tables_refuse_single_file_options(tmp_path, option):
+    rules = tmp_path / "tables.ini"
+    rules.write_text(
+        "[tables]\nnames = companies\n\n[companies.rec]\nnum = 10\n"
+        "[companies.c1]\nname = ID\ndtype = int\ndata = company\n"
+    )
+    output = tmp_path / "out"
+    assert main(["--config", str(rules), "--output", str(output), *option]) == 1
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("method", ["name", "date_object", "pyint", "pydecimal"])
+def test_pool_cache_keeps_types(tmp_path, method):
+    from fakerengine import fakerdata
+
+    cold = get_faker_pool(method, 30, None, str(tmp_path))
+    fakerdata._pool_cache.clear()
+    warm = get_faker_pool(method, 30, None, str(tmp_path))
+    fakerdata._pool_cache.clear()
+    assert [type(v) for v in warm] == [type(v) for v in cold]
+    assert list(warm) == list(cold)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from fakerengine.expression import evaluate_expression, parse_expression
+
+
+def test_constants_are_floats():
+    # Python ints would take forever on 9 ** 9 ** 9
+    expression = parse_expression("c1 + 9 ** 9 ** 9")
+    data = evaluate_expression(expression, {"c1": np.arange(3)}, 3)
+    assert np.isinf(data).all()
+
+
+@pytest.mark.parametrize("text", ["'ab' * 5", "c1 + 'a'", "where(c1 > 1, 'a', 'b')"])
+def test_strings_only_in_comparisons(text):
+    with pytest.raises(ValueError):
+        parse_expression(text)
+
+
+def test_string_comparison():
+    expression = parse_expression("where(c1 == 'Win', c2, 0)")
+    columns = {"c1": np.array(["Win", "Loss"], dtype=object), "c2": np.array([3, 4])}
+    assert evaluate_expression(expression, columns, 2).tolist() == [3.0, 0.0]
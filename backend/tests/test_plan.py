@@ -0,0 +1,29 @@
+import pytest
+
+from conftest import make_config
+from fakerengine.fakerdata import check_unique_pools
+from fakerengine.plan import compile_plan
+
+
+def unique_int_config(num):
+    config = make_config(num=num)
+    config["c21"] = {
+        "name": "Number",
+        "dtype": "int",
+        "data": "faker",
+        "faker_method": "pyint",
+        "unique": "true",
+    }
+    return config
+
+
+def test_unique_faker_ints_need_a_large_enough_pool():
+    with pytest.raises(ValueError, match=r"\[rec\] num = 30000"):
+        compile_plan(unique_int_config(30000))
+
+
+def test_unique_faker_ints_need_enough_distinct_values():
+    # pyint has 10000 possible values, not all of them drawn into the pool
+    config = unique_int_config(9999)
+    with pytest.raises(ValueError, match=r"\[rec\] num = 9999"):
+        check_unique_pools(compile_plan(config), 9999)
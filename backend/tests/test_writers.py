@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+from fakerengine.writers import write_chunks
+
+
+def failing_chunks():
+    yield pd.DataFrame({"ID": [1, 2], "Name": ["a", "b"]})
+    raise RuntimeError("generation failed")
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.csv.gz", "out.parquet"])
+def test_failed_run_leaves_no_output(tmp_path, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    with pytest.raises(RuntimeError):
+        write_chunks(failing_chunks(), str(tmp_path / name))
+    assert list(tmp_path.iterdir()) == []